@@ -0,0 +1,81 @@
+"""
+Benchmark of entering and exiting `pyconject` contexts.
+
+Run with `python benchmarks/bench_cntx.py` from the repository root.
+"""
+
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pyconject import pyconject  # noqa: E402
+
+
+def report(name, seconds, number):
+    print(f"{name:<32} {seconds / number * 1e6:10.2f} us/context")
+
+
+def enter_exit(config_path=None):
+    with pyconject.cntx(config_path=config_path):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Context enter/exit latency.")
+    parser.add_argument("-n", "--number", type=int, default=2_000)
+    args = parser.parse_args()
+
+    report(
+        "cntx() construction",
+        timeit.timeit(lambda: pyconject.cntx(), number=args.number),
+        args.number,
+    )
+    report(
+        "outermost enter/exit",
+        timeit.timeit(enter_exit, number=args.number),
+        args.number,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "configs.yml"
+        with open(config_path, "wt") as f:
+            yaml.safe_dump({"__main__": {"func": {"a": 1}}}, f)
+
+        with pyconject.cntx():
+            report(
+                "nested enter/exit",
+                timeit.timeit(lambda: enter_exit(config_path), number=args.number),
+                args.number,
+            )
+
+        # a small override on top of a large outer context
+        base_path = Path(tmp_dir) / "base.yml"
+        with open(base_path, "wt") as f:
+            yaml.safe_dump(
+                {
+                    f"pkg_{p}": {
+                        f"mod_{m}": {
+                            f"func_{i}": {"a": i, "b": [1, 2, 3]} for i in range(10)
+                        }
+                        for m in range(20)
+                    }
+                    for p in range(20)
+                },
+                f,
+            )
+        with pyconject.cntx(config_path=base_path):
+            report(
+                "nested enter/exit, large base",
+                timeit.timeit(lambda: enter_exit(config_path), number=args.number),
+                args.number,
+            )
+
+
+if __name__ == "__main__":
+    main()
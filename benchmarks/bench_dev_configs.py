@@ -0,0 +1,106 @@
+"""
+Benchmark of loading the developer configs of a large synthetic package tree
+serially and on a thread pool.
+
+Run with `python benchmarks/bench_dev_configs.py` from the repository root. Use
+`--latency-ms` to simulate a slow (e.g. network) filesystem.
+"""
+
+import argparse
+import builtins
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pyconject import pyconject  # noqa: E402
+from pyconject.cache import parsed_file_cache  # noqa: E402
+
+
+def write_package_tree(root, packages, modules, functions):
+    """Writes `packages` packages of `modules` modules with dev configs each."""
+    names = []
+    for p in range(packages):
+        pkg = root / f"bench_pkg_{p}"
+        pkg.mkdir()
+        (pkg / "__init__.py").write_text("")
+        with open(pkg / "pyconject.yml", "wt") as f:
+            yaml.safe_dump(
+                {f"mod_{m}": {"func_0": {"a": p}} for m in range(modules)}, f
+            )
+        for m in range(modules):
+            (pkg / f"mod_{m}.py").write_text(
+                "".join(
+                    f"def func_{i}(a, b, c):\n    return a, b, c\n\n\n"
+                    for i in range(functions)
+                )
+            )
+            with open(pkg / f"pyconject-mod_{m}.yml", "wt") as f:
+                yaml.safe_dump(
+                    {
+                        f"func_{i}": {"b": f"{p}-{m}-{i}", "c": list(range(20))}
+                        for i in range(functions)
+                    },
+                    f,
+                )
+            names.append(f"bench_pkg_{p}.mod_{m}")
+    return names
+
+
+def slow_open(open_, latency):
+    def _open(*args, **kwargs):
+        time.sleep(latency)
+        return open_(*args, **kwargs)
+
+    return _open
+
+
+def load(registry, max_workers):
+    registry.max_workers = max_workers
+    parsed_file_cache.invalidate()
+    start = time.perf_counter()
+    configs = registry.load_dev_configs(force=True)
+    return configs, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dev config loading comparison.")
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--functions", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        names = write_package_tree(
+            Path(tmp_dir), args.packages, args.modules, args.functions
+        )
+        sys.path.insert(0, tmp_dir)
+        for name in names:
+            pyconject.mdle(name)
+
+        if args.latency_ms > 0:
+            builtins.open = slow_open(builtins.open, args.latency_ms / 1e3)
+
+        registry = pyconject._cntx_stack.registry
+        files = registry._get_dev_config_files()
+        print(f"{len(files)} dev config files, {len(names)} modules")
+
+        expected, _ = load(registry, 1)
+        for workers in [1] + args.workers:
+            best = float("inf")
+            for _ in range(args.repeat):
+                configs, elapsed = load(registry, workers)
+                assert configs == expected
+                best = min(best, elapsed)
+            print(f"{workers:>3} workers {best * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
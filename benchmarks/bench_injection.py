@@ -0,0 +1,119 @@
+"""
+Micro-benchmark of the call overhead of `pyconject` wrapped functions.
+
+Run with `python benchmarks/bench_injection.py` from the repository root.
+"""
+
+import argparse
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pyconject import pyconject  # noqa: E402
+
+
+def bench_func(a, b, c, d=4):
+    return a, b, c, d
+
+
+def bench_func_generic(a, b, c, d=4):
+    return a, b, c, d
+
+
+class BenchClass:
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+
+    def method(self, c):
+        return self.a, self.b, c
+
+
+def report(name, seconds, number, baseline=None):
+    per_call = seconds / number * 1e9
+    line = f"{name:<32} {per_call:10.1f} ns/call"
+    if baseline is not None:
+        line += f"  ({per_call - baseline:+.1f} ns vs unwrapped)"
+    print(line)
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wrapped call overhead.")
+    parser.add_argument("-n", "--number", type=int, default=200_000)
+    args = parser.parse_args()
+
+    wrapped = pyconject.wrap(bench_func)
+    registry = pyconject._cntx_stack.registry
+    registry.codegen = False
+    generic = pyconject.wrap(bench_func_generic)
+    registry.codegen = True
+    WrappedClass = pyconject.wrap(BenchClass)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "configs.yml"
+        with open(config_path, "wt") as f:
+            yaml.safe_dump(
+                {
+                    "__main__": {
+                        "bench_func": {"b": 2, "c": 3},
+                        "bench_func_generic": {"b": 2, "c": 3},
+                        "BenchClass": {"__init__": {"b": 2}, "method": {"c": 3}},
+                    }
+                },
+                f,
+            )
+
+        with pyconject.cntx(config_path=config_path):
+            assert wrapped(1) == (1, 2, 3, 4)
+
+            baseline = report(
+                "unwrapped",
+                timeit.timeit(lambda: bench_func(1, 2, 3, 4), number=args.number),
+                args.number,
+            )
+            for name, func in [("generated", wrapped), ("generic", generic)]:
+                report(
+                    f"{name} (all given)",
+                    timeit.timeit(lambda: func(1, 2, 3, 4), number=args.number),
+                    args.number,
+                    baseline,
+                )
+                report(
+                    f"{name} (b, c injected)",
+                    timeit.timeit(lambda: func(1), number=args.number),
+                    args.number,
+                    baseline,
+                )
+
+            baseline = report(
+                "unwrapped class construction",
+                timeit.timeit(lambda: BenchClass(1, 2), number=args.number),
+                args.number,
+            )
+            report(
+                "wrapped class (b injected)",
+                timeit.timeit(lambda: WrappedClass(1), number=args.number),
+                args.number,
+                baseline,
+            )
+            obj, raw_obj = WrappedClass(1), BenchClass(1, 2)
+            baseline = report(
+                "unwrapped method",
+                timeit.timeit(lambda: raw_obj.method(3), number=args.number),
+                args.number,
+            )
+            report(
+                "wrapped method (c injected)",
+                timeit.timeit(lambda: obj.method(), number=args.number),
+                args.number,
+                baseline,
+            )
+
+
+if __name__ == "__main__":
+    main()
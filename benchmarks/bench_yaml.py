@@ -0,0 +1,84 @@
+"""
+Benchmark of parsing a large synthetic config tree with each YAML loader and
+as JSON, and of parsing only the subtrees of a few modules.
+
+Run with `python benchmarks/bench_yaml.py` from the repository root.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from pyconject import loaders  # noqa: E402
+
+
+def synthetic_tree(packages, modules, functions):
+    return {
+        f"pkg_{p}": {
+            f"mod_{m}": {
+                f"func_{f}": {
+                    "a": f * 1.5,
+                    "b": f"value-{p}-{m}-{f}",
+                    "c": [f, f + 1, f + 2],
+                    "d": {"enabled": f % 2 == 0, "timeout": 30},
+                }
+                for f in range(functions)
+            }
+            for m in range(modules)
+        }
+        for p in range(packages)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Config parser comparison.")
+    parser.add_argument("--packages", type=int, default=20)
+    parser.add_argument("--modules", type=int, default=20)
+    parser.add_argument("--functions", type=int, default=20)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.packages, args.modules, args.functions)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "configs.yml"
+        with open(path, "wt") as f:
+            yaml.safe_dump(tree, f)
+        data = path.read_bytes()
+        print(f"synthetic config: {len(data) / 1e6:.1f} MB")
+
+        for name in ["python", "c"]:
+            if loaders.YAML_LOADERS[name] is None:
+                print(f"{name:<16} not available")
+                continue
+            loaders.set_yaml_loader(name)
+            start = time.perf_counter()
+            parsed = loaders.parse_yaml(data)
+            elapsed = time.perf_counter() - start
+            assert parsed == tree
+            print(f"{name:<16} {elapsed * 1e3:10.1f} ms")
+
+            key_paths = frozenset(("pkg_0", f"mod_{m}") for m in range(3))
+            start = time.perf_counter()
+            parsed = loaders.parse_yaml_filtered(data, key_paths)
+            elapsed = time.perf_counter() - start
+            assert parsed == {
+                "pkg_0": {f"mod_{m}": tree["pkg_0"][f"mod_{m}"] for m in range(3)}
+            }
+            print(f"{name + ', 3 modules':<16} {elapsed * 1e3:10.1f} ms")
+
+        json_data = json.dumps(tree).encode("utf-8")
+        start = time.perf_counter()
+        parsed = loaders.parse_json(json_data)
+        elapsed = time.perf_counter() - start
+        assert parsed == tree
+        print(f"{'json':<16} {elapsed * 1e3:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
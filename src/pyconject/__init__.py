@@ -1,9 +1,22 @@
-from .providers import ConfigProvider, DeveloperConfigProvider, ClientYamlProvider
-
 __version__ = "0.2.1"
 
 __all__ = [
     "ConfigProvider",
     "DeveloperConfigProvider",
     "ClientYamlProvider",
+    "EnvironmentProvider",
 ]
+
+
+def __getattr__(name):
+    # the providers (and the config parsers behind them) are imported on first
+    # access so that `import pyconject` stays cheap
+    if name in __all__:
+        from . import providers
+
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,76 @@
+"""
+Command line interface of `pyconject`.
+
+    python -m pyconject compile --package my_pkg --target dev --output manifests/
+
+imports the given packages (registering their items) and writes the manifests
+of the base configs and of every target (see `pyconject.manifest`).
+"""
+
+import argparse
+import sys
+import time
+
+
+def _compile(args) -> int:
+    from .manifest import compile_manifests
+
+    start = time.perf_counter()
+    paths = compile_manifests(
+        args.package,
+        targets=args.target,
+        config_path=args.config_path,
+        directory=args.output,
+    )
+    elapsed = time.perf_counter() - start
+    for path in paths:
+        print(f"wrote {path}")
+    print(f"compiled {len(paths)} manifest(s) in {elapsed * 1e3:.1f} ms")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m pyconject")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = commands.add_parser(
+        "compile",
+        help="prebuild the config manifests of packages",
+        description="Imports the packages and writes one manifest of their "
+        "resolved dev and client configs per target.",
+    )
+    compile_parser.add_argument(
+        "-p",
+        "--package",
+        action="append",
+        default=[],
+        help="a package (or module) to import; may be repeated",
+    )
+    compile_parser.add_argument(
+        "-t",
+        "--target",
+        action="append",
+        default=[],
+        help="a target environment (e.g. dev); may be repeated. The manifest "
+        "of the base configs is always written.",
+    )
+    compile_parser.add_argument(
+        "-c",
+        "--config-path",
+        default=None,
+        help="the client's config file (default: ./configs.yml)",
+    )
+    compile_parser.add_argument(
+        "-o",
+        "--output",
+        default=".pyconject-manifests",
+        help="the manifest directory (default: .pyconject-manifests)",
+    )
+    compile_parser.set_defaults(handler=_compile)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+Shared cache of parsed config files for `pyconject`.
+
+Parsed files are keyed by their resolved path, validated against their stat
+signature on every lookup and evicted in least-recently-used order once the
+cache holds too many entries or too many (approximate) bytes.
+
+The names of the files in config directories are cached as well, so that the
+many conventional dev config files that do not exist are skipped without
+trying to open them.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def stat_signature(path) -> Optional[Tuple[int, int, int]]:
+    """
+    Returns the `(st_ino, st_size, st_mtime_ns)` of a file.
+
+    Args:
+        path (str or Path): The path of the file.
+
+    Returns:
+        tuple: The stat signature, or None if the file cannot be stat-ed.
+    """
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def is_fresh(stamps: dict) -> bool:
+    """Returns whether none of the paths changed since `stamps` were recorded."""
+    return all(stat_signature(path) == stamp for path, stamp in stamps.items())
+
+
+class SourceFiles:
+    """
+    Stat signatures of the files a configuration was built from.
+
+    Attributes:
+        stamps (dict): Maps file paths to their stat signatures (None for files
+            that did not exist).
+        cacheable (bool): False if a file was read whose contents could not be
+            matched to a stat signature (e.g. a virtual file or one that changed
+            while being read); results built from it must not be cached.
+    """
+
+    def __init__(self):
+        self.stamps = {}
+        self.cacheable = True
+
+    def __len__(self):
+        return len(self.stamps)
+
+    def add(self, path, stamp, loaded: bool = True) -> None:
+        """Records that `path` with signature `stamp` was (attempted to be) loaded."""
+        self.stamps[str(path)] = stamp
+        if loaded and stamp is None:
+            self.cacheable = False
+
+    def update(self, other: "SourceFiles") -> None:
+        """Records the files of `other` as well."""
+        self.stamps.update(other.stamps)
+        self.cacheable = self.cacheable and other.cacheable
+
+    def is_fresh(self) -> bool:
+        """Returns whether none of the files changed since they were recorded."""
+        return is_fresh(self.stamps)
+
+
+class ParsedFileCache:
+    """
+    Bounded LRU cache of parsed files.
+
+    The size of an entry is approximated by the size of its file.
+
+    Attributes:
+        max_entries (int): The maximum number of cached files.
+        max_bytes (int): The maximum total size of the cached files.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to read and parse the file.
+        evictions (int): Number of entries evicted to stay within the bounds.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._nbytes = 0
+        self._entries = OrderedDict()  # path -> (stamp, parsed)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def load(
+        self, path, parse: Callable[[Any], Any], variant=None
+    ) -> Tuple[Any, Optional[tuple]]:
+        """
+        Returns the parsed contents of a file, reading it only if needed.
+
+        Files that cannot be stat-ed (e.g. virtual or missing files) are opened
+        in text mode and parsed without being cached.
+
+        Args:
+            path (str or Path): The path of the file.
+            parse (callable): Parses the contents (bytes or a text stream).
+            variant (hashable, optional): Distinguishes the results of parsers
+                that only parse parts of the file; cached separately.
+
+        Returns:
+            tuple: The parsed contents and the stat signature they belong to. The
+                signature is None if the contents were not cached.
+        """
+        stamp = stat_signature(path)
+        if stamp is None:
+            with open(path, "rt") as f:
+                return parse(f), None
+
+        key = os.path.realpath(path)
+        if variant is not None:
+            key = (key, variant)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], stamp
+            self.misses += 1
+
+        with open(path, "rb") as f:
+            data = f.read()
+        parsed = parse(data)
+        if len(data) != stamp[1]:
+            return parsed, None  # changed while being read
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._nbytes -= old[0][1]
+            self._entries[key] = (stamp, parsed)
+            self._nbytes += stamp[1]
+            self._evict()
+        return parsed, stamp
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._nbytes > self.max_bytes
+        ):
+            key, (stamp, _) = self._entries.popitem(last=False)
+            self._nbytes -= stamp[1]
+            self.evictions += 1
+            logger.debug(f"evicted {key} from the parsed file cache")
+
+    def invalidate(self, path=None) -> None:
+        """Drops the cached contents of `path`, or of all files if not given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._nbytes = 0
+            else:
+                path = os.path.realpath(path)
+                for key in [
+                    key
+                    for key in self._entries
+                    if key == path or (isinstance(key, tuple) and key[0] == path)
+                ]:
+                    old = self._entries.pop(key)
+                    self._nbytes -= old[0][1]
+
+    def stats(self) -> dict:
+        """Returns the counters and the current size of the cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+            }
+
+
+# directories modified this recently may still change within the same mtime tick
+_RACY_INTERVAL_NS = 2_000_000_000
+
+
+class DirectoryListings:
+    """
+    Cache of the names of the entries of directories.
+
+    A listing is validated against the stat signature of its directory, whose
+    mtime changes whenever an entry is created, removed or renamed. Listings
+    of directories modified in the last two seconds are not cached.
+
+    Attributes:
+        scans (int): Number of directories listed with `os.scandir`.
+    """
+
+    def __init__(self):
+        self.scans = 0
+        self._entries = {}  # path -> (stamp, names)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, directory, listings: Dict = None) -> FrozenSet[str]:
+        """
+        Returns the names of the entries of `directory`.
+
+        Args:
+            directory (str or Path): The directory.
+            listings (dict, optional): Listings already validated by the caller,
+                keyed by directory; updated in place. Passing the same dict for
+                a batch of lookups stats every directory only once.
+
+        Returns:
+            frozenset: The names, empty if the directory cannot be listed.
+        """
+        directory = str(directory)
+        if listings is not None and directory in listings:
+            return listings[directory]
+
+        stamp = stat_signature(directory)
+        names = frozenset()
+        if stamp is not None:
+            key = os.path.realpath(directory)
+            with self._lock:
+                entry = self._entries.get(key, None)
+            if entry is not None and entry[0] == stamp:
+                names = entry[1]
+            else:
+                names = self._scan(key, stamp)
+
+        if listings is not None:
+            listings[directory] = names
+        return names
+
+    def _scan(self, key, stamp) -> FrozenSet[str]:
+        try:
+            with os.scandir(key) as entries:
+                names = frozenset(entry.name for entry in entries)
+        except OSError:
+            return frozenset()
+        self.scans += 1
+        if (
+            stat_signature(key) == stamp
+            and time.time_ns() - stamp[2] > _RACY_INTERVAL_NS
+        ):
+            with self._lock:
+                self._entries[key] = (stamp, names)
+        return names
+
+    def exists(self, path, listings: Dict = None) -> bool:
+        """Returns whether `path` is listed in its (cached) directory."""
+        directory, name = os.path.split(os.path.abspath(path))
+        return name in self.get(directory, listings)
+
+    def invalidate(self) -> None:
+        """Drops all cached listings."""
+        with self._lock:
+            self._entries.clear()
+
+
+parsed_file_cache = ParsedFileCache()
+directory_listings = DirectoryListings()
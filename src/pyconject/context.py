@@ -5,18 +5,30 @@ This module provides the `Cntx` class for managing configuration contexts
 and the `CntxStack` singleton for handling configuration stacks.
 """
 
-from copy import deepcopy
+from contextvars import ContextVar
 from pathlib import Path
+from typing import NamedTuple
+import itertools
 import logging
-import inspect
+import os
+import sys
+import threading
 
-from .registry import Registry
-from .utils import Stack, merge_dictionaries
-from .providers import DeveloperConfigProvider, ClientYamlProvider
+from .cache import SourceFiles
+from .registry import Registry, _prefix_parts
+from .utils import get_from_prefixed_tree, merge_dictionaries
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# with the separator, so that sibling packages such as `pyconject_ext` are not matched
+_PACKAGE_DIR = os.path.dirname(__file__) + os.sep
+_IGNORED_FRAME_PATTERNS = (
+    "<frozen importlib._bootstrap>",
+    "<pytest",
+    "<ipython-input-",
+)
+
 
 class Cntx:
     """
@@ -26,22 +38,19 @@ class Cntx:
         target (str): The target environment (e.g., "dev", "stg", "prd").
         config_path (str or Path): The path to the configuration file.
         cntx_stack (CntxStack): The context stack instance.
+        glb (dict): The globals of the code creating the context.
     """
 
     def __init__(self, target=None, config_path=None, cntx_stack=None):
-        self.cntx_stack = cntx_stack if cntx_stack else _cntx_stack
-
-        frame = inspect.currentframe()
+        self.cntx_stack = cntx_stack if cntx_stack else get_cntx_stack()
 
+        # Only the code objects' filenames are checked; building full frame infos
+        # would read source lines through `linecache` for every frame.
+        frame = sys._getframe(1)
         while frame:
-            filename = inspect.getframeinfo(frame).filename
-            if not any(
-                pattern in filename
-                for pattern in [
-                    "<frozen importlib._bootstrap>",
-                    "<pytest",
-                    "<ipython-input-",
-                ]
+            filename = frame.f_code.co_filename
+            if not filename.startswith(_PACKAGE_DIR) and not any(
+                pattern in filename for pattern in _IGNORED_FRAME_PATTERNS
             ):
                 self.glb = frame.f_globals
                 break  # Exit after modifying the first suitable frame
@@ -64,14 +73,236 @@ class Cntx:
         self.cntx_stack.unstack()
 
 
+class ConfigIndex:
+    """
+    Flat index of a configuration dictionary keyed by registered prefix.
+
+    Wrapped callables look up their ready-to-inject keyword arguments here with
+    a single dictionary lookup instead of walking the configuration tree.
+
+    Attributes:
+        configs (dict): The indexed configuration dictionary.
+        generation (int): Unique number of the context stack push the index
+            was built for.
+        kw_args (dict): Maps prefixes to the configs found under them.
+        dev_configs (LazyDevConfigs): The developer configs merged underneath
+            `configs` on first use of a prefix; None if `configs` already
+            include them.
+        parent (ConfigIndex): The index of the enclosing context, whose entries
+            are reused for the prefixes `overrides` do not touch.
+        overrides (dict): What the context of this index merged on top of the
+            configs of `parent`.
+    """
+
+    def __init__(
+        self,
+        configs,
+        generation,
+        prefixes=(),
+        dev_configs=None,
+        parent=None,
+        overrides=None,
+    ):
+        self.configs = configs
+        self.generation = generation
+        self.kw_args = {}
+        self.dev_configs = dev_configs
+        self.parent = parent
+        self.overrides = overrides if overrides is not None else {}
+        for prefix in prefixes:
+            self.add(prefix)
+
+    def _is_overridden(self, prefix):
+        tree = self.overrides
+        for part in _prefix_parts(prefix):
+            if not isinstance(tree, dict):
+                return True
+            if part not in tree:
+                return False
+            tree = tree[part]
+        return True
+
+    def add(self, prefix):
+        """Indexes the configs found under `prefix` and returns them."""
+        if self.parent is not None and not self._is_overridden(prefix):
+            kw_args = self.parent.get(prefix)
+            self.kw_args[prefix] = kw_args
+            return kw_args
+
+        kw_args = get_from_prefixed_tree(self.configs, prefix)
+        kw_args = kw_args if isinstance(kw_args, dict) else {}
+        if self.dev_configs is not None:
+            dev_kw_args = self.dev_configs.get(prefix)
+            if dev_kw_args:
+                kw_args = merge_dictionaries(dev_kw_args, kw_args)
+        self.kw_args[prefix] = kw_args
+        return kw_args
+
+    def add_trie(self, trie):
+        """
+        Indexes the configs under all prefixes of a `PrefixTrie`.
+
+        The configs are walked along the trie, so the parts shared by prefixes
+        are looked up once; prefixes without configs are left to `get`.
+        """
+        stack = [(trie, self.configs)]
+        while stack:
+            node, tree = stack.pop()
+            for prefix in node.prefixes:
+                if prefix.startswith("."):
+                    self.add(prefix)  # looked up by its raw parts
+                else:
+                    self.kw_args[prefix] = tree if isinstance(tree, dict) else {}
+            if isinstance(tree, dict):
+                for part, child in list(node.children.items()):
+                    if part in tree:
+                        stack.append((child, tree[part]))
+
+    def get(self, prefix):
+        """Returns the configs found under `prefix`."""
+        kw_args = self.kw_args.get(prefix, None)
+        return kw_args if kw_args is not None else self.add(prefix)
+
+
+class LazyDevConfigs:
+    """
+    Developer configs of an outermost context, loaded item by item.
+
+    The dev config files of an item (and of its ancestors) are only read when
+    the configs under its prefix are first looked up. Nested contexts share the
+    instance of their outermost context, just like they share its dev configs
+    when these are loaded eagerly.
+
+    Attributes:
+        registry (Registry): The registry of the items.
+        target (str): The target environment of the outermost context.
+    """
+
+    def __init__(self, registry, target=None):
+        self.registry = registry
+        self.target = target
+        self._kw_args = {}
+
+    def get(self, prefix):
+        """Returns the developer configs under `prefix`, loading them if needed."""
+        kw_args = self._kw_args.get(prefix, None)
+        if kw_args is None:
+            self.registry.flush()
+            kw_args = self.registry.load_item_dev_configs(prefix, target=self.target)
+            self._kw_args[prefix] = kw_args
+        return kw_args
+
+
+class _Frame(NamedTuple):
+    """An entry of the context stack."""
+
+    configs: dict
+    target: str
+    index: ConfigIndex
+    dev_configs: LazyDevConfigs = None
+
+
+class _LiveFrame:
+    """
+    An entry of the context stack whose client configs are reloaded when their
+    files change (see `pyconject.reload.ConfigWatcher`).
+
+    The configs and their index are held in one tuple that a reload replaces as
+    a whole, so wrapped calls see either the old or the new configs.
+
+    Attributes:
+        state (tuple): The `(configs, index)` of the frame.
+        target (str): The target environment.
+        dev_configs (LazyDevConfigs): See `_Frame`.
+        provider (ClientYamlProvider): Loads the client's configs of the frame.
+        base (dict): The configs the client's configs are merged on top of
+            (the dev configs of an outermost context).
+        env_overrides (dict): The environment overrides applied on top.
+        parent (_Frame or _LiveFrame): The frame of the enclosing context.
+    """
+
+    __slots__ = (
+        "state",
+        "target",
+        "dev_configs",
+        "provider",
+        "base",
+        "env_overrides",
+        "parent",
+        "__weakref__",
+    )
+
+    def __init__(
+        self, state, target, dev_configs, provider, base, env_overrides, parent
+    ):
+        self.state = state
+        self.target = target
+        self.dev_configs = dev_configs
+        self.provider = provider
+        self.base = base
+        self.env_overrides = env_overrides
+        self.parent = parent
+
+    @property
+    def configs(self):
+        return self.state[0]
+
+    @property
+    def index(self):
+        return self.state[1]
+
+
+class _FrameStackView:
+    """
+    Stack-like view over one field of the frames of a `CntxStack`.
+
+    Popping from the view removes the whole frame.
+    """
+
+    def __init__(self, cntx_stack, field: str):
+        self._cntx_stack = cntx_stack
+        self._field = field
+
+    def __len__(self):
+        return len(self._cntx_stack._frames.get())
+
+    def is_empty(self):
+        return len(self) == 0
+
+    def pop(self):
+        frames = self._cntx_stack._frames.get()
+        if not frames:
+            raise IndexError("Cannot pop from an empty stack")
+        self._cntx_stack._frames.set(frames[:-1])
+        return getattr(frames[-1], self._field)
+
+    def peek(self):
+        frames = self._cntx_stack._frames.get()
+        return getattr(frames[-1], self._field) if frames else None
+
+
 class CntxStack:
     """
     Singleton class for managing configuration stacks.
 
+    The stack lives in a `contextvars.ContextVar` holding an immutable tuple of
+    frames, so that every thread and asyncio task sees its own contexts while
+    reads stay lock-free.
+
     Attributes:
-        config_stack (Stack): Stack of configuration dictionaries.
-        target_stack (Stack): Stack of target environments.
+        config_stack (_FrameStackView): Stack of configuration dictionaries.
+        target_stack (_FrameStackView): Stack of target environments.
         registry (Registry): The registry for managing registered items.
+        snapshots (SnapshotStore): Where snapshots of outermost contexts are kept;
+            None (the default unless `PYCONJECT_SNAPSHOT_DIR` is set) disables them.
+        manifests (ManifestStore): Where prebuilt manifests of outermost
+            contexts are loaded from; None (the default unless
+            `PYCONJECT_MANIFEST_DIR` is set) disables them.
+        env_provider (EnvironmentProvider): Applies `PYCONJECT__*` environment
+            variables on top of every pushed context; None disables them.
+        watcher (ConfigWatcher): Reloads the client's configs of the contexts
+            pushed while it is set when their files change; None (the default
+            unless `PYCONJECT_HOT_RELOAD` is set) disables hot reloading.
     """
 
     _instance = None
@@ -82,9 +313,31 @@ class CntxStack:
         return cls._instance
 
     def __init__(self):
-        self.config_stack = Stack()
-        self.target_stack = Stack()
+        self._frames = ContextVar("pyconject_frames", default=())
+        self._generations = itertools.count(1)
+        self.config_stack = _FrameStackView(self, "configs")
+        self.target_stack = _FrameStackView(self, "target")
+        from .providers import EnvironmentProvider
+
         self.registry = Registry(self)
+        self.snapshots = None
+        snapshot_dir = os.environ.get("PYCONJECT_SNAPSHOT_DIR", None)
+        if snapshot_dir:
+            from .snapshot import SnapshotStore
+
+            self.snapshots = SnapshotStore(snapshot_dir)
+        self.manifests = None
+        manifest_dir = os.environ.get("PYCONJECT_MANIFEST_DIR", None)
+        if manifest_dir:
+            from .manifest import ManifestStore
+
+            self.manifests = ManifestStore(manifest_dir)
+        self.env_provider = EnvironmentProvider(priority=30)
+        self.watcher = None
+        if os.environ.get("PYCONJECT_HOT_RELOAD", "").lower() in ("1", "true", "yes"):
+            from .reload import ConfigWatcher
+
+            self.watcher = ConfigWatcher(self).start()
 
     def stack(self, target=None, config_path=None):
         """
@@ -100,14 +353,79 @@ class CntxStack:
         Returns:
             dict: The merged configuration dictionary.
         """
+        self.registry.flush()
+
         # Get the base (previous) configuration from the stack
-        prev_configs = self.config_stack.peek()
+        frames = self._frames.get()
+        prev_configs = frames[-1].configs if frames else None
+
+        # In lazy mode, the dev configs are merged into the index per prefix
+        if frames:
+            dev_configs = frames[-1].dev_configs
+        elif self.registry.lazy_dev_configs:
+            dev_configs = LazyDevConfigs(self.registry, target=target)
+        else:
+            dev_configs = None
+
+        # Only the registered subtrees of the client's files may be loaded
+        key_paths = (
+            self.registry.get_key_paths()
+            if self.registry.filter_client_configs
+            else None
+        )
+
+        # An outermost context may be loaded from its prebuilt manifest
+        if (
+            prev_configs is None
+            and dev_configs is None
+            and self.manifests is not None
+            and self.watcher is None
+        ):
+            configs = self.manifests.load(
+                self.registry, config_path=config_path, target=target
+            )
+            if configs is not None:
+                configs = merge_dictionaries(configs, self._load_env_overrides())
+                self._push(configs, target)
+                return configs
+
+        # An outermost context may be restored from its snapshot
+        snapshot = None
+        if prev_configs is None and self.snapshots is not None and self.watcher is None:
+            from .snapshot import snapshot_key
+
+            snapshot = (
+                snapshot_key(config_path=config_path, target=target),
+                (
+                    (
+                        None
+                        if dev_configs is not None
+                        else (
+                            self.registry._get_dev_config_files(target=None),
+                            (
+                                self.registry._get_dev_config_files(target=target)
+                                if target is not None
+                                else None
+                            ),
+                        )
+                    ),
+                    key_paths,
+                ),
+            )
+            configs = self.snapshots.load(*snapshot)
+            if configs is not None:
+                env_overrides = self._load_env_overrides()
+                configs = merge_dictionaries(configs, env_overrides)
+                self._push(configs, target, dev_configs)
+                return configs
+
+        from .providers import ClientYamlProvider, DeveloperConfigProvider
 
         # Create a list of providers for this context
         providers = []
 
         # If no previous config exists, add developer config providers
-        if prev_configs is None:
+        if prev_configs is None and dev_configs is None:
             # Add base developer configs provider
             dev_provider_base = DeveloperConfigProvider(
                 priority=10, registry=self.registry, target=None
@@ -127,6 +445,7 @@ class CntxStack:
             config_path=config_path,
             target=target,
             base_configs=prev_configs if prev_configs is not None else {},
+            key_paths=key_paths,
         )
         providers.append(client_provider)
 
@@ -135,26 +454,152 @@ class CntxStack:
 
         # Merge configurations from all providers
         configs = {}
+        sources = SourceFiles()
         for provider in providers:
+            if provider is client_provider:
+                base = configs
             provider_config = provider.load()
             configs = merge_dictionaries(configs, provider_config)
+            sources.update(provider.sources)
+
+        if snapshot is not None:
+            self.snapshots.save(*snapshot, sources, configs)
+
+        env_overrides = self._load_env_overrides()
+        if env_overrides:
+            configs = merge_dictionaries(configs, env_overrides)
+        if self.watcher is not None:
+            parent = frames[-1] if frames else None
+            frame = _LiveFrame(
+                None, target, dev_configs, client_provider, base, env_overrides, parent
+            )
+            frame.state = (configs, self._build_live_index(frame, configs))
+            self._frames.set(frames + (frame,))
+            self.watcher.track(frame)
+        elif not frames:
+            self._push(configs, target, dev_configs)
+        else:
+            # nested contexts share the untouched subtrees (and index entries)
+            # of their parent; only what they override is indexed anew
+            overrides = merge_dictionaries(client_provider.overrides, env_overrides)
+            self._push(configs, target, dev_configs, frames[-1].index, overrides)
+        return configs
 
-        self.config_stack.push(configs)
-        self.target_stack.push(target)
+    def _build_live_index(self, frame, configs):
+        if frame.parent is None:
+            return self._build_index(configs, frame.dev_configs)
+        overrides = merge_dictionaries(frame.provider.overrides, frame.env_overrides)
+        return self._build_index(
+            configs, frame.dev_configs, frame.parent.index, overrides
+        )
 
-        return configs
+    def reload(self, frame) -> bool:
+        """
+        Reloads the client's configs of a live frame if any of their files (or
+        the configs of its enclosing context) changed.
 
-    def get_configs(self):
-        # load dev config if it is not there yet
-        if len(self.config_stack) < 1:
+        Only the changed files are re-read; the new configs and index are then
+        swapped into the frame in one step.
+
+        Returns:
+            bool: Whether the frame was reloaded.
+        """
+        provider = frame.provider
+        if (
+            frame.parent is not None
+            and provider.base_configs is not frame.parent.configs
+        ):
+            provider.base_configs = frame.parent.configs
+        elif provider.sources.is_fresh():
+            return False
+        configs = merge_dictionaries(frame.base, provider.load())
+        if frame.env_overrides:
+            configs = merge_dictionaries(configs, frame.env_overrides)
+        frame.state = (configs, self._build_live_index(frame, configs))
+        return True
+
+    def _load_env_overrides(self):
+        # applied on every push (and kept out of snapshots) so that environment
+        # variables always take precedence over the config files
+        if self.env_provider is None:
+            return {}
+        return self.env_provider.load()
+
+    def _build_index(self, configs, dev_configs=None, parent=None, overrides=None):
+        # lazily loaded dev configs are only looked up for the prefixes in use,
+        # and nested contexts look up their parent's entries on first use
+        index = ConfigIndex(
+            configs,
+            next(self._generations),
+            dev_configs=dev_configs,
+            parent=parent,
+            overrides=overrides,
+        )
+        if dev_configs is None and parent is None:
+            index.add_trie(self.registry._trie)
+        return index
+
+    def _push(self, configs, target, dev_configs=None, parent=None, overrides=None):
+        index = self._build_index(configs, dev_configs, parent, overrides)
+        frame = _Frame(configs, target, index, dev_configs)
+        self._frames.set(self._frames.get() + (frame,))
+
+    def _get_frame(self):
+        frames = self._frames.get()
+        if not frames:
+            if threading.current_thread() is not threading.main_thread():
+                logger.warning(
+                    "No pyconject context entered in thread "
+                    f"{threading.current_thread().name}; using the default configs. "
+                    "Contexts are not inherited by new threads, see "
+                    "`pyconject.carry_cntx`."
+                )
+            # load dev config if it is not there yet
             self.stack()
-        return self.config_stack.peek()  # if len(self.config_stack) > 1 else {}
+            frames = self._frames.get()
+        return frames[-1]
+
+    def get_configs(self):
+        return self._get_frame().configs
+
+    def get_index(self):
+        """Returns the flat index of the configuration on top of the stack."""
+        return self._get_frame().index
+
+    def get_kw_args(self, prefix):
+        """Returns the configs under `prefix` in the current context."""
+        return self._get_frame().index.get(prefix)
+
+    def index_prefix(self, prefix):
+        """Adds a newly registered prefix to the current index."""
+        frames = self._frames.get()
+        if frames and frames[-1].dev_configs is None:
+            frames[-1].index.add(prefix)
 
     def unstack(self):
-        if len(self.config_stack) > 0:
-            self.config_stack.pop()
-        if len(self.target_stack) > 0:
-            self.target_stack.pop()
+        frames = self._frames.get()
+        if frames:
+            self._frames.set(frames[:-1])
 
 
-_cntx_stack = CntxStack()
+_cntx_stack_lock = threading.Lock()
+_cntx_stack_instance = None
+
+
+def get_cntx_stack() -> CntxStack:
+    """
+    Returns the `CntxStack` singleton, creating it (and its `Registry`) on first
+    use rather than when `pyconject` is imported.
+    """
+    global _cntx_stack_instance
+    if _cntx_stack_instance is None:
+        with _cntx_stack_lock:
+            if _cntx_stack_instance is None:
+                _cntx_stack_instance = CntxStack()
+    return _cntx_stack_instance
+
+
+def __getattr__(name):
+    if name == "_cntx_stack":
+        return get_cntx_stack()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
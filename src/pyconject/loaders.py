@@ -0,0 +1,200 @@
+"""
+Parsers of config files for `pyconject`.
+
+YAML files are parsed with PyYAML's LibYAML based `CSafeLoader` when PyYAML was
+built with LibYAML and with the pure-Python `SafeLoader` otherwise. The loader
+can also be chosen explicitly with `set_yaml_loader` or the
+`PYCONJECT_YAML_LOADER` environment variable ("auto", "c" or "python").
+
+The format of a file is chosen by its extension: `.json` files are parsed with
+`json`, `.toml` files with `tomllib` (or `tomli` before Python 3.11) and all
+other files as YAML.
+
+Files can also be parsed restricted to a set of key paths (see `get_parser`).
+YAML documents are then composed from the parser's event stream, building
+nodes only for the subtrees under those paths.
+
+PyYAML and the JSON and TOML parsers are imported when the first file of
+their format is parsed.
+"""
+
+from pathlib import Path
+from typing import Callable, FrozenSet, Optional, Tuple, Union
+import functools
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_yaml_loaders() -> dict:
+    import yaml
+
+    return {
+        "c": getattr(yaml, "CSafeLoader", None),
+        "python": yaml.SafeLoader,
+    }
+
+
+def __getattr__(name):
+    # PyYAML is only imported once its loaders are needed
+    if name == "YAML_LOADERS":
+        return _get_yaml_loaders()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _select_yaml_loader(loader: Union[str, type]) -> type:
+    if not isinstance(loader, str):
+        return loader
+    yaml_loaders = _get_yaml_loaders()
+    if loader == "auto":
+        return yaml_loaders["c"] or yaml_loaders["python"]
+    if loader not in yaml_loaders:
+        raise ValueError(
+            f"Unknown YAML loader {loader!r}; expected one of 'auto', 'c' or 'python'."
+        )
+    if yaml_loaders[loader] is None:
+        raise ValueError("The LibYAML based loader is not available in this PyYAML.")
+    return yaml_loaders[loader]
+
+
+# the name of the loader is resolved when the first YAML file is parsed
+_yaml_loader = os.environ.get("PYCONJECT_YAML_LOADER", "auto")
+
+
+def set_yaml_loader(loader: Union[str, type] = "auto") -> None:
+    """
+    Selects the loader used to parse YAML files.
+
+    Args:
+        loader (str or type): "auto" (LibYAML when available), "c" (LibYAML),
+            "python" (pure-Python) or a PyYAML loader class.
+    """
+    global _yaml_loader
+    _yaml_loader = _select_yaml_loader(loader)
+    logger.debug(f"parsing YAML files with {_yaml_loader.__name__}")
+
+
+def get_yaml_loader() -> type:
+    """Returns the loader used to parse YAML files."""
+    global _yaml_loader
+    if isinstance(_yaml_loader, str):
+        _yaml_loader = _select_yaml_loader(_yaml_loader)
+    return _yaml_loader
+
+
+def parse_yaml(stream):
+    """Parses YAML from a string, bytes or a stream with the selected loader."""
+    import yaml
+
+    return yaml.load(stream, Loader=get_yaml_loader())
+
+
+def build_key_trie(key_paths) -> dict:
+    """
+    Builds a trie of key paths.
+
+    Args:
+        key_paths (iterable of tuples): The key paths, e.g. `("black_p", "black_m")`.
+
+    Returns:
+        dict: Maps keys to the trie of the keys below them; None marks a path
+            whose whole subtree is wanted.
+    """
+    trie = {}
+    for parts in key_paths:
+        node = trie
+        for i, part in enumerate(parts):
+            if i == len(parts) - 1:
+                node[part] = None
+            elif part not in node:
+                node[part] = {}
+            elif node[part] is None:
+                break  # an ancestor is wanted already
+            node = node[part]
+    return trie
+
+
+def filter_tree(data, trie: Optional[dict]):
+    """Returns the parts of a parsed tree under the key paths of `trie`."""
+    if trie is None or not isinstance(data, dict):
+        return data
+    return {
+        key: filter_tree(value, trie[key]) for key, value in data.items() if key in trie
+    }
+
+
+def parse_yaml_filtered(stream, key_paths: FrozenSet[Tuple[str, ...]]):
+    """
+    Parses YAML keeping only the subtrees under `key_paths` (see `build_key_trie`).
+
+    The rest of the document is parsed into events but never composed or
+    constructed, so memory and time are mostly spent on the wanted subtrees.
+    """
+    from .yaml_filter import FilteringLoader
+
+    loader = FilteringLoader(stream, build_key_trie(key_paths), get_yaml_loader())
+    try:
+        return loader.get_single_data()
+    finally:
+        loader.dispose()
+
+
+def parse_json(stream):
+    """Parses JSON from a string, bytes or a text stream."""
+    import json
+
+    if isinstance(stream, (str, bytes, bytearray)):
+        return json.loads(stream)
+    return json.load(stream)
+
+
+def parse_toml(stream):
+    """Parses TOML from a string, bytes or a text stream."""
+    try:
+        import tomllib
+    except ImportError:  # Python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ImportError(
+                "Parsing TOML files requires Python 3.11+ or `tomli`."
+            ) from None
+    if isinstance(stream, (bytes, bytearray)):
+        stream = stream.decode("utf-8")
+    elif not isinstance(stream, str):
+        stream = stream.read()
+    return tomllib.loads(stream)
+
+
+PARSERS = {
+    ".json": parse_json,
+    ".toml": parse_toml,
+}
+
+# alternatives tried (in order) when a `.yml` config file does not exist
+CONFIG_SUFFIXES = (".json", ".toml")
+
+
+def _parse_filtered(parse: Callable, key_paths, stream):
+    return filter_tree(parse(stream), build_key_trie(key_paths))
+
+
+def get_parser(path, key_paths: FrozenSet[Tuple[str, ...]] = None) -> Callable:
+    """
+    Returns the parser of a config file, chosen by its extension.
+
+    Args:
+        path (str or Path): The path of the file.
+        key_paths (frozenset of tuples, optional): Only keep the subtrees under
+            these key paths. YAML files are parsed with `parse_yaml_filtered`;
+            other formats are parsed fully and filtered afterwards.
+    """
+    parse = PARSERS.get(Path(path).suffix.lower(), parse_yaml)
+    if key_paths is None:
+        return parse
+    if parse is parse_yaml:
+        return functools.partial(parse_yaml_filtered, key_paths=key_paths)
+    return functools.partial(_parse_filtered, parse, key_paths)
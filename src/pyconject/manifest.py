@@ -0,0 +1,164 @@
+"""
+Prebuilt config manifests for `pyconject`.
+
+A manifest holds the fully merged and reference-resolved dev and client configs
+of an outermost context for one target, built ahead of time (e.g. while a
+container image is built) with:
+
+    python -m pyconject compile --package my_pkg --target dev --target prd
+
+At runtime, a manifest found in the manifest directory is loaded instead of
+discovering, parsing and merging the config files, as long as no registered
+item is missing from it and none of the files and config directories it was
+built from changed (new dev config files change their directory).
+
+Manifests record the absolute paths and stat signatures (including inodes) of
+those files, so they only match where they were compiled: compile them in the
+checkout and working directory the service runs from, not in another checkout
+whose files are copied afterwards. Manifests are pickles (see
+`pyconject.pickles`).
+"""
+
+from pathlib import Path
+import logging
+import os
+
+from .cache import SourceFiles, is_fresh, stat_signature
+from .pickles import dump_pickle, load_pickle
+from .snapshot import snapshot_key
+from .utils import find_package_modules, merge_dictionaries
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_MANIFEST_VERSION = 1
+
+
+def build_manifest(registry, config_path=None, target=None) -> dict:
+    """
+    Resolves the dev and client configs of all registered items for `target`.
+
+    Args:
+        registry (Registry): The registry of the items.
+        config_path (str or Path or dict, optional): The client's config file(s).
+        target (str, optional): The target environment.
+
+    Returns:
+        dict: The manifest.
+    """
+    from .providers import ClientYamlProvider, DeveloperConfigProvider
+
+    registry.flush()
+    providers = [DeveloperConfigProvider(priority=10, registry=registry)]
+    if target is not None:
+        providers.append(
+            DeveloperConfigProvider(priority=11, registry=registry, target=target)
+        )
+    providers.append(
+        ClientYamlProvider(priority=20, config_path=config_path, target=target)
+    )
+
+    configs = {}
+    sources = SourceFiles()
+    for provider in providers:
+        configs = merge_dictionaries(configs, provider.load())
+        sources.update(provider.sources)
+
+    # dev config files created later are detected by their directory changing
+    directories = {
+        str(reg_item.file_path.parent)
+        for reg_item in registry._registry.values()
+        if reg_item.file_path is not None
+    }
+    directories.update(
+        os.path.dirname(os.path.abspath(path)) for path in sources.stamps
+    )
+    return {
+        "version": _MANIFEST_VERSION,
+        "key": snapshot_key(config_path=config_path, target=target),
+        "prefixes": sorted(registry._registry),
+        "stamps": dict(sources.stamps),
+        "directories": {d: stat_signature(d) for d in sorted(directories)},
+        "configs": configs,
+    }
+
+
+class ManifestStore:
+    """
+    Directory of config manifests, one per target.
+
+    Attributes:
+        directory (Path): The directory the manifests are stored in.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def get_path(self, target=None) -> Path:
+        """Returns the path of the manifest of `target`."""
+        name = "pyconject" if target is None else f"pyconject-{target}"
+        return self.directory / f"{name}.manifest"
+
+    def save(self, manifest: dict) -> Path:
+        """Writes a manifest from `build_manifest`; returns its path."""
+        path = self.get_path(manifest["key"][1])
+        dump_pickle(path, manifest)
+        return path
+
+    def load(self, registry, config_path=None, target=None) -> dict:
+        """
+        Loads the configs of the manifest of `target` if it is up to date.
+
+        Args:
+            registry (Registry): The registry of the items in use.
+            config_path (str or Path or dict, optional): The client's config file(s).
+            target (str, optional): The target environment.
+
+        Returns:
+            dict: The configs, or None if there is no up-to-date manifest.
+        """
+        manifest = load_pickle(self.get_path(target), f"config manifest for {target}")
+        if (
+            manifest is None
+            or manifest.get("version") != _MANIFEST_VERSION
+            or not set(manifest["prefixes"]).issuperset(registry._registry)
+        ):
+            return None
+        if manifest.get("key") != snapshot_key(config_path, target):
+            logger.debug(
+                f"config manifest for {target} was compiled for "
+                f"{manifest['key'][0]!r}, not {config_path!r}"
+            )
+            return None
+        if not is_fresh(manifest["stamps"]) or not is_fresh(manifest["directories"]):
+            logger.debug(f"config manifest for {target} is out of date")
+            return None
+        return manifest["configs"]
+
+
+def compile_manifests(packages, targets=(), config_path=None, directory=".") -> list:
+    """
+    Imports `packages` (with all their modules) and writes the manifests of the
+    base configs and of every target in `targets` to `directory`.
+
+    Returns:
+        list of Path: The written manifests.
+    """
+    import importlib
+
+    from .context import get_cntx_stack
+
+    # every module is imported so that all items register themselves
+    for package in packages:
+        for name in find_package_modules(importlib.import_module(package)):
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                logger.warning(f"Skipping module {name} that failed to import: {e}")
+    registry = get_cntx_stack().registry
+    store = ManifestStore(directory)
+    paths = []
+    for target in dict.fromkeys([None, *targets]):
+        manifest = build_manifest(registry, config_path=config_path, target=target)
+        paths.append(store.save(manifest))
+    return paths
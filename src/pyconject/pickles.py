@@ -0,0 +1,55 @@
+"""
+On-disk pickles of configs for `pyconject`, shared by snapshots and manifests.
+
+Files are written atomically (to a temporary file that replaces the target),
+so readers never see partial files; they hold the stat signatures of the files
+the configs were built from, checked with `pyconject.cache.is_fresh`.
+
+These files are pickles; only point the snapshot and manifest directories at
+locations that are not writable by untrusted users.
+"""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+def load_pickle(path, description: str):
+    """
+    Reads a pickle written by `dump_pickle`.
+
+    Args:
+        path (Path): The path of the file.
+        description (str): What the file holds, for the warning if unreadable.
+
+    Returns:
+        The unpickled object, or None if the file is missing or unreadable.
+    """
+    import pickle
+
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable {description}: {e}")
+        return None
+
+
+def dump_pickle(path, obj) -> None:
+    """Writes `obj` to `path` atomically, creating its directory if needed."""
+    import pickle
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first so readers never see partial files
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
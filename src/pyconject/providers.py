@@ -6,10 +6,12 @@ various sources (developer configs, client YAML files, etc.).
 """
 
 from abc import ABC, abstractmethod
-from copy import deepcopy
 from pathlib import Path
 import logging
+import os
 
+from .cache import SourceFiles
+from .loaders import parse_yaml
 from .utils import load_and_merge_configs, merge_dictionaries
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,8 @@ class ConfigProvider(ABC):
     A provider is responsible for loading configuration data from a specific source
     and returning it as a dictionary. Providers are prioritized to determine the order
     in which they are applied when merging configurations.
+
+    Providers reading files record them in `sources` while loading.
     """
 
     def __init__(self, priority: int):
@@ -34,6 +38,7 @@ class ConfigProvider(ABC):
                            are applied first.
         """
         self.priority = priority
+        self.sources = SourceFiles()
 
     @abstractmethod
     def load(self) -> dict:
@@ -69,7 +74,7 @@ class DeveloperConfigProvider(ConfigProvider):
 
     def load(self) -> dict:
         """Load developer-defined configurations."""
-        return self.registry.load_dev_configs(force=True, target=self.target)
+        return self.registry.load_dev_configs(target=self.target, sources=self.sources)
 
 
 class ClientYamlProvider(ConfigProvider):
@@ -77,7 +82,18 @@ class ClientYamlProvider(ConfigProvider):
     Loads configuration from client-provided YAML files.
 
     This provider loads the user's base configs.yml file and, if a target is
-    specified, merges in the target-specific configs-{target}.yml file.
+    specified, merges in the target-specific configs-{target}.yml file. JSON and
+    TOML files (by extension) are loaded as well.
+
+    The files are merged on top of `base_configs` without copying it, so the
+    result shares all subtrees the files do not touch; configs are never
+    modified in place. After loading, `overrides` holds the merged files alone.
+
+    If `key_paths` are given, only the subtrees of the files under these key
+    paths are loaded (e.g. those of the registered items).
+
+    Loading again (e.g. to pick up changed files) re-reads only the files whose
+    layer changed on disk; the other layers are reused as they are.
     """
 
     def __init__(
@@ -86,6 +102,7 @@ class ClientYamlProvider(ConfigProvider):
         config_path=None,
         target: str = None,
         base_configs: dict = None,
+        key_paths=None,
     ):
         """
         Initialize the client YAML provider.
@@ -97,15 +114,38 @@ class ClientYamlProvider(ConfigProvider):
             target (str): The target environment (e.g., "dev", "qa", "prd").
             base_configs (dict): The base configuration dictionary to merge into.
                                 If None, an empty dict is used.
+            key_paths (frozenset of tuples): The key paths to load; None loads
+                                the whole files.
         """
         super().__init__(priority)
         self.config_path = config_path
         self.target = target
         self.base_configs = base_configs if base_configs is not None else {}
+        self.key_paths = key_paths
+        self.overrides = {}
+        self._layers = {}  # config path -> (layer, SourceFiles of the layer)
+
+    def _load_layer(self, config_path, configs):
+        cached = self._layers.get(config_path, None)
+        if cached is not None and cached[1].is_fresh():
+            layer, sources = cached
+        else:
+            sources = SourceFiles()
+            layer = load_and_merge_configs(
+                config_path, {}, sources=sources, key_paths=self.key_paths
+            )
+            self._layers[config_path] = (layer, sources)
+        self.sources.update(sources)
+        if not layer:
+            return configs
+        self.overrides = merge_dictionaries(self.overrides, layer)
+        return merge_dictionaries(configs, layer)
 
     def load(self) -> dict:
         """Load client-provided YAML configurations."""
-        configs = deepcopy(self.base_configs)
+        configs = self.base_configs
+        self.overrides = {}
+        self.sources = SourceFiles()
 
         # Default config path
         if self.config_path is None:
@@ -122,7 +162,7 @@ class ClientYamlProvider(ConfigProvider):
             config_path_ = Path(config_path)
 
         logger.debug(f"loading user defined common config from {config_path_}")
-        configs = load_and_merge_configs(config_path_, configs)
+        configs = self._load_layer(config_path_, configs)
 
         # Load target-specific config if target is provided
         if self.target is not None:
@@ -138,6 +178,89 @@ class ClientYamlProvider(ConfigProvider):
             logger.debug(
                 f"loading user defined {self.target} config from {tgt_config_path}"
             )
-            configs = load_and_merge_configs(tgt_config_path, configs)
+            configs = self._load_layer(tgt_config_path, configs)
+
+        return configs
+
+
+def _split_variable_name(name: str) -> list:
+    """Splits `name` by "__" into keys, keeping dunder keys such as `__init__`."""
+    parts = name.split("__")
+    keys = []
+    i = 0
+    while i < len(parts):
+        # "a____init____b" splits into "a", "", "init", "", "b"
+        if 0 < i and i + 2 < len(parts) and parts[i] == parts[i + 2] == "":
+            if parts[i + 1]:
+                keys.append(f"__{parts[i + 1]}__")
+                i += 3
+                continue
+        keys.append(parts[i])
+        i += 1
+    return keys
+
+
+class EnvironmentProvider(ConfigProvider):
+    """
+    Loads configuration overrides from environment variables.
+
+    A variable such as `PYCONJECT__black_p__black_sp__black_m__black_func__c=3`
+    sets `c` of `black_p.black_sp.black_m.black_func`. Dunder keys are spelled
+    out, e.g. `PYCONJECT__pkg__Cls____init____a` sets `a` of `pkg.Cls.__init__`.
+    The environment is scanned once per context push; wrapped calls only see
+    the merged configs.
+    """
+
+    def __init__(
+        self,
+        priority: int,
+        prefix: str = "PYCONJECT__",
+        parse_values: bool = False,
+        environ=None,
+    ):
+        """
+        Initialize the environment provider.
+
+        Args:
+            priority (int): The priority level for this provider.
+            prefix (str): The prefix of the variables to read; the rest of the
+                name is split by "__" into the keys of the config tree.
+            parse_values (bool): Parse the values as YAML (or JSON) scalars, e.g.
+                "3" into 3 and "true" into True, instead of keeping strings.
+            environ (Mapping, optional): The variables to read; `os.environ` by default.
+        """
+        super().__init__(priority)
+        self.prefix = prefix
+        self.parse_values = parse_values
+        self.environ = environ
+
+    def _parse_value(self, value: str):
+        try:
+            return parse_yaml(value)
+        except Exception:
+            return value
+
+    def load(self) -> dict:
+        """Load the overrides defined in the environment."""
+        environ = self.environ if self.environ is not None else os.environ
+        prefix_len = len(self.prefix)
+        overrides = []
+        for name, value in environ.items():
+            if not name.startswith(self.prefix):
+                continue
+            parts = _split_variable_name(name[prefix_len:])
+            if "" in parts:
+                logger.warning(f"Ignoring malformed config variable {name}")
+                continue
+            overrides.append((parts, value))
 
+        # deeper keys are applied last so that they win over their parents
+        configs = {}
+        for parts, value in sorted(overrides, key=lambda x: len(x[0])):
+            tree = configs
+            for part in parts[:-1]:
+                if not isinstance(tree.get(part, None), dict):
+                    tree[part] = {}
+                tree = tree[part]
+            tree[parts[-1]] = self._parse_value(value) if self.parse_values else value
         return configs
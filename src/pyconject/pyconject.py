@@ -5,11 +5,21 @@ This module provides decorators and functions for registering functions,
 classes, and modules, as well as initializing and managing contexts.
 """
 
+from typing import NamedTuple, Tuple
 import functools
+import importlib
+import logging
+import time
 import warnings
 import inspect
 
-from .context import _cntx_stack, Cntx
+from .context import Cntx, get_cntx_stack
+from .loaders import set_yaml_loader  # noqa: F401 part of the public API
+from .registry import wrap_module_lazily
+from .utils import find_package_modules
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 
 def func(_func=None):
@@ -23,9 +33,9 @@ def func(_func=None):
         callable: The registered function.
     """
     return (
-        functools.partial(_cntx_stack.registry.register, by_dev=True)
+        functools.partial(get_cntx_stack().registry.register, by_dev=True)
         if _func is None
-        else _cntx_stack.registry.register(_func, by_dev=True)
+        else get_cntx_stack().registry.register(_func, by_dev=True)
     )
 
 
@@ -40,9 +50,9 @@ def clss(_clss=None):
         type: The registered class.
     """
     return (
-        functools.partial(_cntx_stack.registry.register, by_dev=True)
+        functools.partial(get_cntx_stack().registry.register, by_dev=True)
         if _clss is None
-        else _cntx_stack.registry.register(_clss, by_dev=True)
+        else get_cntx_stack().registry.register(_clss, by_dev=True)
     )
 
 
@@ -56,15 +66,18 @@ def mdle(_mdle: str):
     Returns:
         module: The registered module.
     """
-    return _cntx_stack.registry.register(_mdle, by_dev=True)
+    return get_cntx_stack().registry.register(_mdle, by_dev=True)
 
 
-def wrap(*targets):
+def wrap(*targets, lazy=False):
     """
     Wraps the given targets or patches modules in-place.
 
     Args:
         *targets: One or more targets (callables or modules) to wrap.
+        lazy (bool): Patch the functions of modules only when they are first
+            accessed as attributes of the module (e.g. `module.func` or
+            `from module import func`), so unused functions are never wrapped.
 
     Returns:
         The wrapped callable, a tuple of wrapped callables, or None.
@@ -81,16 +94,17 @@ def wrap(*targets):
                 results.append(None)
                 continue
 
-            for name, item in vars(target).items():
-                if (
-                    inspect.isfunction(item)
-                ) and inspect.getmodule(item) is target:
-                    wrapped = _cntx_stack.registry.register(item, by_dev=False)
-                    setattr(target, name, wrapped)
+            if lazy:
+                wrap_module_lazily(target, get_cntx_stack().registry)
+            else:
+                for name, item in vars(target).items():
+                    if inspect.isfunction(item) and inspect.getmodule(item) is target:
+                        wrapped = get_cntx_stack().registry.register(item, by_dev=False)
+                        setattr(target, name, wrapped)
             setattr(target, "__pyconject_wrapped__", True)
             results.append(None)
         elif callable(target):
-            wrapped = _cntx_stack.registry.register(target, by_dev=False)
+            wrapped = get_cntx_stack().registry.register(target, by_dev=False)
             results.append(wrapped)
         else:
             results.append(target)
@@ -104,6 +118,85 @@ def wrap(*targets):
     return tuple(results)
 
 
+class WrapReport(NamedTuple):
+    """
+    What `wrap_package` wrapped.
+
+    Attributes:
+        modules (int): The number of modules patched.
+        items (int): The number of functions wrapped (or to be wrapped lazily).
+        elapsed (float): The seconds it took.
+        failed (tuple of str): The modules that could not be imported.
+    """
+
+    modules: int
+    items: int
+    elapsed: float
+    failed: Tuple[str, ...] = ()
+
+
+def wrap_package(package, include=None, exclude=None, lazy=False) -> WrapReport:
+    """
+    Patches the functions of all modules of a package in-place in one pass.
+
+    The modules are found with a single `pkgutil` walk and filtered by their
+    qualified names before they are imported, so excluded modules (e.g. tests
+    or optional integrations of a third-party package) are never imported.
+
+    Args:
+        package (str or module): The package to wrap, e.g. "pkg".
+        include (list of str, optional): Glob patterns of the qualified names of
+            the modules to wrap, e.g. `["pkg.io.*"]`; all modules by default.
+        exclude (list of str, optional): Glob patterns of the modules to skip,
+            e.g. `["pkg.tests*"]`; matching sub-packages are not walked.
+        lazy (bool): Wrap the functions only on first access (see `wrap`).
+
+    Returns:
+        WrapReport: The number of modules and functions wrapped and the time
+            it took.
+    """
+    start = time.perf_counter()
+    if isinstance(package, str):
+        package = importlib.import_module(package)
+    registry = get_cntx_stack().registry
+
+    modules, items, failed = 0, 0, []
+    for name in find_package_modules(package, include=include, exclude=exclude):
+        if name.startswith("pyconject"):
+            continue
+        try:
+            module = importlib.import_module(name)
+        except Exception as e:
+            logger.warning(f"Skipping module {name} that failed to import: {e}")
+            failed.append(name)
+            continue
+        if getattr(module, "__pyconject_wrapped__", False):
+            continue
+
+        functions = {
+            n: item
+            for n, item in vars(module).items()
+            if inspect.isfunction(item)
+            and item.__module__ == name
+            and not getattr(item, "__pyconject_wrapped__", False)
+        }
+        if lazy:
+            wrap_module_lazily(module, registry)
+        else:
+            for n, item in functions.items():
+                setattr(module, n, registry.register(item, by_dev=False))
+        setattr(module, "__pyconject_wrapped__", True)
+        modules += 1
+        items += len(functions)
+
+    report = WrapReport(modules, items, time.perf_counter() - start, tuple(failed))
+    logger.info(
+        f"wrapped {report.items} functions of {report.modules} modules of "
+        f"{package.__name__} in {report.elapsed * 1e3:.1f} ms"
+    )
+    return report
+
+
 def init(caller_globals):
     """
     DEPRECATED: Initializes `pyconject` by registering all global functions and classes.
@@ -148,3 +241,203 @@ def cntx(config_path=None, target=None):
     """
     cntx = Cntx(target=target, config_path=config_path)
     return cntx
+
+
+def carry_cntx(fn):
+    """
+    Returns a callable running `fn` in the contexts entered where it is created.
+
+    Contexts are local to the thread (or asyncio task) that entered them, so a
+    thread started inside `with pyconject.cntx(...)` does not see the context.
+    Wrapping the thread's target carries it over, e.g.
+    `executor.submit(pyconject.carry_cntx(func), *args)`.
+
+    Args:
+        fn (callable): The callable to run.
+
+    Returns:
+        callable: Runs `fn` in a copy of the current contexts on every call.
+    """
+    import contextvars
+
+    context = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def run_in_cntx(*args, **kwargs):
+        # every call gets its own copy, so calls may run concurrently
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run_in_cntx
+
+
+def invalidate_dev_configs():
+    """
+    Drops the cached developer configs so that the next outermost context
+    re-reads the `pyconject*.yml` files.
+
+    The cache is also refreshed automatically whenever one of these files
+    changes on disk.
+    """
+    get_cntx_stack().registry.invalidate_dev_configs()
+
+
+def set_snapshot_dir(directory):
+    """
+    Keeps snapshots of the merged configs of outermost contexts in `directory`.
+
+    Fresh processes then load the configs of a `(config_path, target)` from its
+    snapshot as long as none of the contributing files changed. The directory
+    can also be set with the `PYCONJECT_SNAPSHOT_DIR` environment variable.
+
+    Args:
+        directory (str or Path): The snapshot directory; None disables snapshots.
+    """
+    from .snapshot import SnapshotStore
+
+    get_cntx_stack().snapshots = SnapshotStore(directory) if directory else None
+
+
+def set_manifest_dir(directory):
+    """
+    Loads outermost contexts from the manifests prebuilt in `directory`.
+
+    Manifests are written by `python -m pyconject compile`; a context whose
+    manifest is present and up to date skips discovering, parsing and merging
+    the config files. The directory can also be set with the
+    `PYCONJECT_MANIFEST_DIR` environment variable.
+
+    Args:
+        directory (str or Path): The manifest directory; None disables manifests.
+    """
+    from .manifest import ManifestStore
+
+    get_cntx_stack().manifests = ManifestStore(directory) if directory else None
+
+
+def set_env_overrides(prefix="PYCONJECT__", parse_values=False):
+    """
+    Configures the overrides of configs by environment variables.
+
+    A variable such as `PYCONJECT__dev_p__dev_func__a=1` overrides `a` of
+    `dev_p.dev_func` in every context, above the client's config files.
+
+    Args:
+        prefix (str, optional): The prefix of the variables; None disables them.
+        parse_values (bool): Parse the values as YAML/JSON scalars instead of
+            keeping them as strings.
+    """
+    from .providers import EnvironmentProvider
+
+    get_cntx_stack().env_provider = (
+        EnvironmentProvider(priority=30, prefix=prefix, parse_values=parse_values)
+        if prefix
+        else None
+    )
+
+
+def set_lazy_dev_configs(enabled=True):
+    """
+    Loads the developer configs of an item only when it is first used.
+
+    With lazy loading, entering an outermost context reads no dev config files.
+    The `pyconject*.yml` files of an item and of its ancestors are read the first
+    time its wrapper or class constructor runs in that context, with the same
+    precedence as when all of them are loaded upfront. Lazy loading can also
+    be enabled with the `PYCONJECT_LAZY_DEV_CONFIGS=1` environment variable.
+
+    Note that `get_configs()` of a lazily loaded context only holds the
+    client's configs.
+
+    Args:
+        enabled (bool): Whether to load the dev configs lazily.
+    """
+    get_cntx_stack().registry.lazy_dev_configs = enabled
+
+
+def set_dev_config_workers(workers=8):
+    """
+    Reads and parses the developer config files on a thread pool.
+
+    This mostly pays off on slow (e.g. network) filesystems with many registered
+    items; on local disks, loading the files one by one is usually faster. The
+    files are merged in the usual order either way. The number of threads can
+    also be set with the `PYCONJECT_DEV_CONFIG_WORKERS` environment variable.
+
+    Args:
+        workers (int): The maximum number of threads; 1 loads the files serially.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    get_cntx_stack().registry.max_workers = workers
+
+
+def set_client_config_filtering(enabled=True):
+    """
+    Loads only the parts of the client's config files used by registered items.
+
+    Large config files shared by many services are then parsed into the subtrees
+    under the prefixes of the registered functions, classes, modules and
+    packages only; the rest of the file is skipped while parsing. Filtering can
+    also be enabled with the `PYCONJECT_FILTER_CLIENT_CONFIGS=1` environment
+    variable.
+
+    Note that items registered (or wrapped) after a context was entered get no
+    configs from the client's files of that context.
+
+    Args:
+        enabled (bool): Whether to filter the client's config files.
+    """
+    get_cntx_stack().registry.filter_client_configs = enabled
+
+
+def set_deferred_registration(enabled=True):
+    """
+    Defers the registration work of `func`, `clss`, `mdle` and `wrap`.
+
+    Registrations are then only queued when they are made (typically at import
+    time) and completed in one batch on the first context push or the first
+    call of a registered function. Since decorators run while their modules
+    are imported, deferral is usually enabled with the
+    `PYCONJECT_DEFER_REGISTRATION=1` environment variable.
+
+    Args:
+        enabled (bool): Whether to defer registrations.
+    """
+    registry = get_cntx_stack().registry
+    if not enabled:
+        registry.flush()
+    registry.deferred = enabled
+
+
+def set_hot_reload(enabled=True, interval=1.0):
+    """
+    Reloads the client's configs of live contexts when their files change.
+
+    Contexts entered after enabling hot reloading are watched: every `interval`
+    seconds, a background thread compares the stat metadata of their config
+    files (including referenced and not yet existing ones). Only changed files
+    are re-read, and the refreshed configs are swapped into the contexts in one
+    step, so calls see either the old or the new configs. Hot reloading can
+    also be enabled with the `PYCONJECT_HOT_RELOAD=1` environment variable.
+
+    Note that config snapshots are not used while hot reloading is enabled.
+
+    Args:
+        enabled (bool): Whether to watch the configs of new contexts.
+        interval (float): The number of seconds between two checks.
+    """
+    from .reload import ConfigWatcher
+
+    cntx_stack = get_cntx_stack()
+    if cntx_stack.watcher is not None:
+        cntx_stack.watcher.stop()
+    cntx_stack.watcher = (
+        ConfigWatcher(cntx_stack, interval).start() if enabled else None
+    )
+
+
+def __getattr__(name):
+    # the context stack is created on first use, see `get_cntx_stack`
+    if name == "_cntx_stack":
+        return get_cntx_stack()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,199 @@
+"""
+Resolution of references between config files for `pyconject`.
+
+A string value such as `"@path/to/file.yml:key1.key2"` is replaced by the value
+found under `key1.key2` in `path/to/file.yml` (relative to the file holding the
+reference). `"@@..."` escapes a literal leading "@".
+
+All references of a loaded config are collected first and every referenced file
+is read and parsed once. Referenced values are resolved themselves, so chains
+of references are followed; circular references are detected. References that
+cannot be resolved keep their original string and are reported together.
+"""
+
+from pathlib import Path
+from typing import List, NamedTuple
+import copy
+import logging
+import re
+
+from .cache import SourceFiles, parsed_file_cache, stat_signature
+from .loaders import get_parser
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_REFERENCE = re.compile(r"@(.*?):(.*)")
+
+
+class CircularReferenceError(ValueError):
+    """Raised while resolving a reference that (indirectly) refers to itself."""
+
+
+class UnresolvedReference(NamedTuple):
+    """A reference that could not be resolved."""
+
+    reference: str
+    config_path: Path
+    reason: str
+
+
+class _Failure(NamedTuple):
+    reason: str
+
+
+def _get_target(reference: str, config_path: Path):
+    """Returns `(file_path, key_path)` of a reference or None for other strings."""
+    if not reference.startswith("@") or reference.startswith("@@"):
+        return None
+    match = _REFERENCE.match(reference)
+    if not match:
+        return None  # it is not a reference it seems
+    file_path, key_path = match.groups()
+    file_path = Path(file_path)
+    if not file_path.is_absolute():
+        file_path = config_path.parent / file_path
+    return file_path, key_path
+
+
+class ReferenceResolver:
+    """
+    Resolves the references of one or more loaded config trees.
+
+    Parsed referenced files and resolved references are memoized per resolver,
+    so resolving a tree takes time linear in its size and in the size of the
+    referenced subtrees.
+
+    Attributes:
+        sources (SourceFiles): Records the referenced files; may be None.
+        unresolved (list): The `UnresolvedReference`s found so far.
+    """
+
+    def __init__(self, sources: SourceFiles = None):
+        self.sources = sources
+        self.unresolved: List[UnresolvedReference] = []
+        self._files = {}  # path -> parsed data or the error loading it
+        self._values = {}  # (path, key path) -> resolved value
+        self._resolving = set()  # the references being resolved (for cycles)
+
+    def resolve(self, data, config_path):
+        """
+        Returns `data` with all references replaced by their values.
+
+        `data` is left untouched (it may be shared through the parsed file
+        cache); dictionaries are rebuilt and lists and sets are copied.
+
+        Args:
+            data: The loaded config tree.
+            config_path (str or Path): The file `data` was loaded from; relative
+                references are resolved against its directory.
+        """
+        config_path = Path(config_path)
+        # group the references by file so that every file is read once upfront
+        targets = {}
+        self._collect(data, config_path, targets)
+        for file_path in targets.values():
+            try:
+                self._load(file_path)
+            except Exception:
+                pass  # reported for every reference to the file
+        return self._substitute(data, config_path)
+
+    def report(self, config_path=None) -> None:
+        """Logs one warning listing the unresolved references, if any."""
+        if not self.unresolved:
+            return
+        details = "; ".join(
+            f"{u.reference!r} in {u.config_path} ({u.reason})" for u in self.unresolved
+        )
+        location = f" of {config_path}" if config_path is not None else ""
+        logger.warning(
+            f"Failed to resolve {len(self.unresolved)} reference(s){location}, "
+            f"keeping the original strings: {details}"
+        )
+
+    def _collect(self, data, config_path: Path, targets: dict) -> None:
+        if isinstance(data, dict):
+            for value in data.values():
+                self._collect(value, config_path, targets)
+        elif isinstance(data, str):
+            target = _get_target(data, config_path)
+            if target is not None:
+                targets.setdefault(str(target[0]), target[0])
+
+    def _substitute(self, data, config_path: Path):
+        if isinstance(data, str):
+            return self.resolve_value(data, config_path)
+        if isinstance(data, dict):
+            return {
+                key: self._substitute(value, config_path) for key, value in data.items()
+            }
+        if isinstance(data, (list, set)):
+            # cached parse results must not be mutated through injected values
+            return copy.deepcopy(data)
+        return data
+
+    def _load(self, file_path: Path):
+        key = str(file_path)
+        if key not in self._files:
+            try:
+                data, stamp = parsed_file_cache.load(file_path, get_parser(file_path))
+                if self.sources is not None:
+                    self.sources.add(file_path, stamp)
+                self._files[key] = data
+            except Exception as e:
+                if self.sources is not None:
+                    self.sources.add(file_path, stat_signature(file_path), loaded=False)
+                self._files[key] = e
+        data = self._files[key]
+        if isinstance(data, Exception):
+            raise data
+        return data
+
+    def resolve_value(self, value: str, config_path: Path):
+        """
+        Returns the value a string refers to.
+
+        Strings that are not references are returned as they are (escaped ones
+        without their first "@"); unresolvable references are recorded in
+        `unresolved` and returned as they are.
+        """
+        if value.startswith("@@"):
+            return value[1:]  # escaped @ character
+        target = _get_target(value, config_path)
+        if target is None:
+            return value
+
+        file_path, key_path = target
+        key = (str(file_path), key_path)
+        if key in self._values:
+            resolved = self._values[key]
+            if isinstance(resolved, _Failure):
+                self._fail(value, config_path, resolved.reason)
+                return value
+            return resolved
+        if key in self._resolving:
+            raise CircularReferenceError("circular reference")
+
+        self._resolving.add(key)
+        try:
+            data = self._load(file_path)
+            for part in key_path.split("."):
+                if not isinstance(data, dict) or part not in data:
+                    raise KeyError(f"key {part!r} not found in {file_path}")
+                data = data[part]
+            resolved = self._substitute(data, file_path)  # follows chains
+        except Exception as e:
+            reason = e.args[0] if isinstance(e, KeyError) else str(e)
+            self._values[key] = _Failure(reason)
+            self._fail(value, config_path, reason)
+            if isinstance(e, CircularReferenceError) and len(self._resolving) > 1:
+                raise  # every reference of the cycle (or leading into it) fails
+            return value
+        finally:
+            self._resolving.discard(key)
+        self._values[key] = resolved
+        return resolved
+
+    def _fail(self, reference: str, config_path: Path, reason: str) -> None:
+        self.unresolved.append(UnresolvedReference(reference, config_path, reason))
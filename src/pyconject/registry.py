@@ -9,22 +9,31 @@ from __future__ import annotations
 
 import importlib
 from enum import Enum
-import types
 import functools
 import inspect
+import os
+import sys
+import threading
+import types
+import weakref
 from pathlib import Path
-from typing import Callable, Dict, Union, List
+from typing import Callable, Dict, List, Optional, Union
 
 import logging
 
 from abc import ABC, abstractmethod
 
 from .utils import (
+    copy_configs,
+    create_prefixed_tree,
     get_from_prefixed_tree,
     get_subs,
     init_default_dev_configs,
-    load_and_merge_configs,
+    load_configs,
+    merge_dictionaries,
+    probe_config_file,
 )
+from .cache import SourceFiles
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -239,22 +248,28 @@ class Package(RegItem):
         return _temp_dict  # this also covers when dev_configs is None
 
 
+def _import_module(name: str):
+    # registered items mostly live in modules that are imported already
+    m = sys.modules.get(name, None)
+    return m if m is not None else importlib.import_module(name)
+
+
 def _create_reg_item(item) -> RegItem:
     try:
         reg_item_type, file_path, m = RegItemType.UNKN, None, None
         if inspect.isclass(item):
-            m = importlib.import_module(item.__module__)
+            m = _import_module(item.__module__)
             file_path = Path(m.__file__)
             reg_item_type = RegItemType.CLSS
         elif callable(item):
-            m = importlib.import_module(item.__module__)
+            m = _import_module(item.__module__)
             file_path = Path(m.__file__)
             reg_item_type = (
                 RegItemType.MTHD if _check_if_method(item) else RegItemType.FUNC
             )
         else:  # package or sub-module registration
             if isinstance(item, str):  # package/module registration by name
-                m = importlib.import_module(item)
+                m = _import_module(item)
             else:  # package/module registration by package/module itself
                 m = item
                 item = f"{m.__module__}.{m.__name__}"
@@ -275,38 +290,234 @@ def _create_reg_item(item) -> RegItem:
             return Ent(item, reg_item_type, file_path, m)
 
 
-def _register_func(f, cntx_stack):
+# function/class/module -> weak reference to its RegItem
+_reg_items = weakref.WeakKeyDictionary()
+
+
+def _get_reg_item(item) -> RegItem:
+    """
+    Returns the memoized `RegItem` of a function, class or module (or module name).
+
+    The `RegItem` of an object is built once and shared by every registration
+    of it as long as it is in use (e.g. held by a `Registry`); entries go away
+    with their object.
+    """
+    key = item
+    if isinstance(item, str):
+        key = sys.modules.get(item, None)
+        if key is None:
+            return _create_reg_item(item)
+    try:
+        ref = _reg_items.get(key, None)
+    except TypeError:  # neither hashable nor weakly referenceable
+        return _create_reg_item(item)
+    reg_item = ref() if ref is not None else None
+    if reg_item is None:
+        reg_item = _create_reg_item(item)
+        if reg_item is not None:
+            try:
+                _reg_items[key] = weakref.ref(reg_item)
+            except TypeError:
+                pass
+    return reg_item
+
+
+class _InjectionPlan:
+    """
+    Pre-computed injection metadata of a wrapped callable.
+
+    The plan is built once at wrap time so that every call only needs to look
+    up the active configs and fill in the missing keyword arguments.
+
+    Attributes:
+        prefix (str): The prefix for configuration keys.
+        key (str): Optional sub-key of the configs (e.g. "__init__" for classes).
+        injectable (tuple): `(position, name)` pairs of the parameters that can be
+            injected as keyword arguments. `position` is None for keyword-only
+            parameters.
+    """
+
+    __slots__ = ("prefix", "key", "injectable")
+
+    def __init__(self, prefix: str, sig: inspect.Signature = None, key: str = None):
+        self.prefix = prefix
+        self.key = key
+
+        injectable = []
+        position = 0
+        parameters = sig.parameters.values() if sig is not None else ()
+        for param in parameters:
+            if param.kind == inspect.Parameter.POSITIONAL_ONLY:
+                position += 1
+            elif param.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD:
+                injectable.append((position, param.name))
+                position += 1
+            elif param.kind == inspect.Parameter.KEYWORD_ONLY:
+                injectable.append((None, param.name))
+        self.injectable = tuple(injectable)
+
+    @classmethod
+    def create(cls, item, key: str = None) -> _InjectionPlan:
+        try:
+            sig = inspect.signature(item)
+        except (TypeError, ValueError):
+            sig = None  # e.g. builtins without signature; nothing to inject
+        prefix = f"{getattr(item, '__module__', None)}.{item.__qualname__}"
+        return cls(prefix, sig, key=key)
+
+    def inject(self, kw_args: Dict, args: tuple, kwargs: Dict) -> Dict:
+        """
+        Fills `kwargs` with the configured values of parameters not given.
+
+        Args:
+            kw_args (dict): The configs found under `prefix`.
+            args (tuple): The positional arguments of the call.
+            kwargs (dict): The keyword arguments of the call; updated in place.
+        """
+        if self.key is not None and kw_args:
+            kw_args = kw_args.get(self.key, None)
+        if kw_args and isinstance(kw_args, dict):
+            num_args = len(args)
+            for position, param_name in self.injectable:
+                # If a parameter is neither given positionally nor as a keyword
+                # and present in the configs, use the value from the configs.
+                if (
+                    param_name in kw_args
+                    and (position is None or position >= num_args)
+                    and param_name not in kwargs
+                ):
+                    kwargs[param_name] = kw_args[param_name]
+        return kwargs
+
+
+_MISSING = object()
+
+
+def _generate_wrapper(f, plan: _InjectionPlan, cntx_stack):
+    """
+    Generates a wrapper with the exact parameter list of `f`.
+
+    Every parameter of the wrapper defaults to a sentinel. Only when one of them
+    is not given are the configs looked up, so no argument binding happens at
+    call time.
+
+    Returns:
+        callable: The wrapper, or None if the signature of `f` is not supported
+            (e.g. builtins, positional-only, `*args` or `**kwargs` parameters).
+            Decorated functions (with `__wrapped__`) are not supported either, as
+            the signature they report may not be the one they accept.
+    """
+    if not inspect.isfunction(f) or hasattr(f, "__wrapped__"):
+        return None
+    try:
+        sig = inspect.signature(f, follow_wrapped=False)
+    except (TypeError, ValueError):
+        return None
+
+    params, call_args, fills, missing_checks = [], [], [], []
+    namespace = {
+        "_pyconject_f": f,
+        "_pyconject_get_kw_args": cntx_stack.get_kw_args,
+        "_pyconject_prefix": plan.prefix,
+        "_pyconject_missing": _MISSING,
+    }
+    keyword_only = False
+    for i, param in enumerate(sig.parameters.values()):
+        name = param.name
+        if name.startswith("_pyconject_") or param.kind in (
+            inspect.Parameter.POSITIONAL_ONLY,
+            inspect.Parameter.VAR_POSITIONAL,
+            inspect.Parameter.VAR_KEYWORD,
+        ):
+            return None
+        if param.kind == inspect.Parameter.KEYWORD_ONLY:
+            if not keyword_only:
+                params.append("*")
+                keyword_only = True
+            call_args.append(f"{name}={name}")
+        else:
+            call_args.append(name)
+        params.append(f"{name}=_pyconject_missing")
+        missing_checks.append(f"{name} is _pyconject_missing")
+
+        if param.default is inspect.Parameter.empty:
+            default = "_pyconject_missing"
+        else:
+            default = f"_pyconject_default_{i}"
+            namespace[default] = param.default
+        fills.append(
+            f"        if {name} is _pyconject_missing:\n"
+            f"            {name} = _pyconject_kw_args.get({name!r}, {default})\n"
+        )
+        if param.default is inspect.Parameter.empty:
+            kind = "keyword-only" if keyword_only else "positional"
+            message = f"{f.__name__}() missing 1 required {kind} argument: {name!r}"
+            fills.append(
+                f"            if {name} is _pyconject_missing:\n"
+                f"                raise TypeError({message!r})\n"
+            )
+
+    source = f"def _pyconject_wrapper({', '.join(params)}):\n"
+    if missing_checks:
+        source += (
+            f"    if {' or '.join(missing_checks)}:\n"
+            "        _pyconject_kw_args = _pyconject_get_kw_args(_pyconject_prefix)\n"
+            + "".join(fills)
+        )
+    source += f"    return _pyconject_f({', '.join(call_args)})\n"
+
+    code = compile(source, f"<pyconject wrapper {plan.prefix}>", "exec")
+    exec(code, namespace)
+    return namespace["_pyconject_wrapper"]
+
+
+def _register_func(f, cntx_stack, codegen: bool = None):
     if getattr(f, "__pyconject_wrapped__", False):
         return f
 
-    @functools.wraps(f)
-    def wrapper_func(*args, **kwargs):
-        # Get the function signature.
-        sig = inspect.signature(f)
-
-        # Bind the given arguments to the function signature.
-        bound_args = sig.bind_partial(*args, **kwargs)
-
-        # Iterate over the parameters in the function signature.
-        reg_item = _create_reg_item(item=f)
-        configs = cntx_stack.get_configs()
-        kw_args = get_from_prefixed_tree(prefix=reg_item.prefix, tree=configs)
-        if kw_args:
-            for param_name, param in sig.parameters.items():
-                # If a parameter is missing from the bound arguments
-                # and present in the configs in the dictionary at top
-                # of cntx_stack, use the value from the dictionary.
-
-                if param_name not in bound_args.arguments and param_name in kw_args:
-                    kwargs[param_name] = kw_args[param_name]
-        value = f(*args, **kwargs)
-        return value
+    plan = _InjectionPlan.create(f)
+
+    if codegen is None:
+        codegen = cntx_stack.registry.codegen
+    wrapper_func = _generate_wrapper(f, plan, cntx_stack) if codegen else None
+
+    if wrapper_func is None:
+
+        def wrapper_func(*args, **kwargs):
+            plan.inject(cntx_stack.get_kw_args(plan.prefix), args, kwargs)
+            return f(*args, **kwargs)
 
+    wrapper_func = functools.wraps(f)(wrapper_func)
     wrapper_func.__pyconject_wrapped__ = True
+    wrapper_func.__pyconject_plan__ = plan
     return wrapper_func
 
 
-def _register_class(cls, cntx_stack):
+def _defer_func(f, cntx_stack):
+    """
+    Wraps `f` without inspecting it.
+
+    The injecting wrapper is only built (and the deferred registrations are
+    completed) when the returned function is first called.
+    """
+    if getattr(f, "__pyconject_wrapped__", False):
+        return f
+
+    wrapper = None
+
+    def deferred_func(*args, **kwargs):
+        nonlocal wrapper
+        if wrapper is None:
+            cntx_stack.registry.flush()
+            wrapper = _register_func(f, cntx_stack)
+        return wrapper(*args, **kwargs)
+
+    deferred_func = functools.wraps(f)(deferred_func)
+    deferred_func.__pyconject_wrapped__ = True
+    return deferred_func
+
+
+def _register_class(cls, cntx_stack, deferred: bool = False):
     if getattr(cls, "__pyconject_wrapped__", False):
         return cls
 
@@ -317,24 +528,11 @@ def _register_class(cls, cntx_stack):
     ):
         return cls
 
+    plan = _InjectionPlan.create(cls, key="__init__")
+
     class WrappedClass(cls):
         def __init__(self, *args, **kwargs):
-            # Signature on the original class for parameter injection
-            sig = inspect.signature(cls)
-            bound_args = sig.bind_partial(*args, **kwargs)
-
-            reg_item = _create_reg_item(item=cls)
-            configs = cntx_stack.get_configs()
-            kw_args = get_from_prefixed_tree(prefix=reg_item.prefix, tree=configs)
-
-            if kw_args:
-                kw_args__init__ = kw_args.get("__init__", {})
-                for param_name, param in sig.parameters.items():
-                    if (
-                        param_name not in bound_args.arguments
-                        and param_name in kw_args__init__
-                    ):
-                        kwargs[param_name] = kw_args__init__[param_name]
+            plan.inject(cntx_stack.get_kw_args(plan.prefix), args, kwargs)
 
             # Some classes (like builtins or those using __new__ magic) don't have
             # standard __init__. We use super().__init__ safely.
@@ -347,22 +545,206 @@ def _register_class(cls, cntx_stack):
                 else:
                     raise
 
-            # Wrap instance methods
-            if kw_args:
-                for attr_name, attr_value in vars(cls).items():
-                    if (
-                        callable(attr_value)
-                        and not attr_name.startswith("__")
-                        and attr_name in kw_args.keys()
-                    ):
-                        wrapped_method = _register_func(attr_value, cntx_stack)
-                        setattr(self, attr_name, types.MethodType(wrapped_method, self))
+    # Wrap methods once per class; being descriptors, they bind to the instances
+    # like the original methods.
+    register_func = _defer_func if deferred else _register_func
+    for attr_name, attr_value in vars(cls).items():
+        if attr_name.startswith("__"):
+            continue
+        if inspect.isfunction(attr_value):
+            setattr(WrappedClass, attr_name, register_func(attr_value, cntx_stack))
+        elif isinstance(attr_value, (staticmethod, classmethod)):
+            wrapped_method = register_func(attr_value.__func__, cntx_stack)
+            setattr(WrappedClass, attr_name, type(attr_value)(wrapped_method))
 
     functools.update_wrapper(WrappedClass, cls, updated=())
     WrappedClass.__pyconject_wrapped__ = True
     return WrappedClass
 
 
+class _PendingFunction:
+    """
+    Data descriptor wrapping a function of a lazily wrapped module when the
+    function is first accessed as an attribute of the module.
+
+    It is installed on a class of its own per module (see `wrap_module_lazily`)
+    and removed once the function is wrapped, so the other attributes of the
+    module, and the wrapped function itself, are looked up natively. The module
+    keeps the function in its `__dict__`, so its own code finds it as a global.
+    """
+
+    __slots__ = ("name", "func", "registry")
+
+    def __init__(self, name, func, registry):
+        self.name = name
+        self.func = func
+        self.registry = registry
+
+    def __get__(self, module, owner=None):
+        if module is None:
+            return self
+        module_vars = vars(module)
+        with type(module)._pyconject_lock:
+            if type(module).__dict__.get(self.name, None) is self:
+                value = module_vars.get(self.name, None)
+                if value is self.func:  # not rebound in the meantime
+                    module_vars[self.name] = self.registry.register(
+                        self.func, by_dev=False
+                    )
+                _drop_pending(module, self.name)
+        try:
+            # re-read, so that every thread gets the function wrapped by the first
+            return module_vars[self.name]
+        except KeyError:
+            raise AttributeError(
+                f"module {module.__name__!r} has no attribute {self.name!r}"
+            ) from None
+
+    def __set__(self, module, value):
+        with type(module)._pyconject_lock:
+            vars(module)[self.name] = value
+            _drop_pending(module, self.name)
+
+    def __delete__(self, module):
+        with type(module)._pyconject_lock:
+            del vars(module)[self.name]
+            _drop_pending(module, self.name)
+
+
+def _drop_pending(module, name) -> None:
+    """Removes the descriptor of `name`; called with the module's lock held."""
+    cls = type(module)
+    if isinstance(cls.__dict__.get(name, None), _PendingFunction):
+        delattr(cls, name)
+    vars(module).get("__pyconject_pending__", {}).pop(name, None)
+    if not any(isinstance(v, _PendingFunction) for v in vars(cls).values()):
+        module.__class__ = types.ModuleType  # a plain module again
+
+
+def wrap_module_lazily(module, registry) -> None:
+    """
+    Wraps the functions defined in `module` when they are first accessed.
+
+    Accessing them as attributes of the module (e.g. `module.func` or
+    `from module import func`) registers them with `registry` and patches the
+    module, so functions that are never used are never wrapped.
+    """
+    pending = {
+        name: (registry, item)
+        for name, item in vars(module).items()
+        if inspect.isfunction(item)
+        and item.__module__ == module.__name__
+        and not getattr(item, "__pyconject_wrapped__", False)
+    }
+    module.__pyconject_pending__ = pending
+    if not pending:
+        return
+
+    cls = type(module)
+    if cls is types.ModuleType:
+        cls = type(
+            "_LazyWrappedModule",
+            (types.ModuleType,),
+            {"__slots__": (), "_pyconject_lock": threading.RLock()},
+        )
+    elif not hasattr(cls, "_pyconject_lock"):
+        return  # a custom module class; its functions are left as they are
+    with cls._pyconject_lock:
+        for name, (_, item) in pending.items():
+            setattr(cls, name, _PendingFunction(name, item, registry))
+        module.__class__ = cls
+
+
+_ALL_TARGETS = object()
+
+
+def _load_dev_config_file(path):
+    """Loads one dev config file; returns `(configs or None, SourceFiles)`."""
+    file_sources = SourceFiles()
+    try:
+        cfgs, _ = load_configs(path, file_sources)
+    except Exception:
+        cfgs = None
+    return cfgs, file_sources
+
+
+def _prefix_parts(prefix: str) -> tuple:
+    # top-level packages have prefixes such as ".dev_p"
+    return tuple(part for part in prefix.split(".") if part)
+
+
+def _get_workers_from_env() -> int:
+    value = os.environ.get("PYCONJECT_DEV_CONFIG_WORKERS", "1")
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        logger.warning(
+            f"Ignoring invalid PYCONJECT_DEV_CONFIG_WORKERS={value!r}; "
+            "loading dev configs serially"
+        )
+        workers = 1
+    return workers
+
+
+class PrefixTrie:
+    """
+    Trie of registered prefixes keyed by their dot-separated parts.
+
+    Iterating a trie yields its prefixes ancestors first, i.e. in the order
+    their dev configs are merged.
+
+    Attributes:
+        children (dict): Maps the next part to the trie below it.
+        prefixes (list): The prefixes registered at this node.
+    """
+
+    __slots__ = ("children", "prefixes")
+
+    def __init__(self):
+        self.children = {}
+        self.prefixes = []
+
+    def __iter__(self):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield from list(node.prefixes)
+            stack.extend(reversed(list(node.children.values())))
+
+    def add(self, prefix: str) -> None:
+        """Adds `prefix`; O(depth)."""
+        node = self
+        for part in _prefix_parts(prefix):
+            child = node.children.get(part, None)
+            if child is None:
+                child = node.children[part] = PrefixTrie()
+            node = child
+        if prefix not in node.prefixes:
+            node.prefixes.append(prefix)
+
+    def find(self, prefix: str) -> Optional[PrefixTrie]:
+        """Returns the trie below `prefix` or None if nothing is registered there."""
+        node = self
+        for part in _prefix_parts(prefix):
+            node = node.children.get(part, None)
+            if node is None:
+                return None
+        return node
+
+    def get_ancestors(self, prefix: str) -> List[str]:
+        """Returns the prefixes of `prefix` and of its ancestors, ancestors first."""
+        ancestors = list(self.prefixes)
+        node = self
+        for part in _prefix_parts(prefix):
+            node = node.children.get(part, None)
+            if node is None:
+                break
+            ancestors.extend(node.prefixes)
+        return ancestors
+
+
 class Registry:
     """
     Manages the registration of items in `pyconject`.
@@ -370,27 +752,71 @@ class Registry:
     Attributes:
         _cntx_stack (CntxStack): The context stack instance.
         _registry (dict): A dictionary of registered items.
-        _loaded_dev_configs (dict): Cached development configurations.
+        _trie (PrefixTrie): The prefixes of the registered items.
+        _dev_configs_cache (dict): Cached developer configs with the files they
+            were loaded from, per target.
+        codegen (bool): Whether to generate wrappers with the exact parameter list
+            of plain Python functions. Other callables always fall back to the
+            generic wrapper.
+        max_workers (int): The number of threads reading and parsing dev config
+            files concurrently (`PYCONJECT_DEV_CONFIG_WORKERS`); 1, the default,
+            loads them serially.
+        parallel_threshold (int): The minimum number of dev config files worth
+            loading on a thread pool.
+        lazy_dev_configs (bool): Load the dev configs of an item (and of its
+            ancestors) only when its wrapper or constructor first runs in a
+            context instead of loading those of all items on the first push
+            (`PYCONJECT_LAZY_DEV_CONFIGS=1`).
+        filter_client_configs (bool): Only load the subtrees of the client's
+            config files that belong to registered items
+            (`PYCONJECT_FILTER_CLIENT_CONFIGS=1`).
+        deferred (bool): Queue registrations and complete them in one batch
+            (see `flush`) on the first context push or call of a registered
+            function instead of at import time (`PYCONJECT_DEFER_REGISTRATION=1`).
     """
 
     def __init__(self, cntx_stack):
         self._cntx_stack = cntx_stack
         self._registry = {}
-        self._loaded_dev_configs = None
+        self._trie = PrefixTrie()
+        self._dev_configs_cache = {}
+        self.codegen = True
+        self.max_workers = _get_workers_from_env()
+        self.parallel_threshold = 16
+        self.lazy_dev_configs = os.environ.get(
+            "PYCONJECT_LAZY_DEV_CONFIGS", ""
+        ).lower() in ("1", "true", "yes")
+        self.filter_client_configs = os.environ.get(
+            "PYCONJECT_FILTER_CLIENT_CONFIGS", ""
+        ).lower() in ("1", "true", "yes")
+        self._key_paths = None
+        self.deferred = os.environ.get("PYCONJECT_DEFER_REGISTRATION", "").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        self._pending = []
+        self._pending_lock = threading.Lock()
 
     def _register(self, item: Union[Callable, str], dev_override: bool = False) -> None:
         # override is for dev registration only;
         # if it is by client, it does not matter
-        entry_inst = _create_reg_item(item=item)
+        entry_inst = _get_reg_item(item)
 
         if entry_inst is None:
             return item  # can't do anything here
 
         prefix = entry_inst.prefix
+        if self._registry.get(prefix, None) is entry_inst:
+            return entry_inst.item  # registered (and wrapped) already
 
         # dev_override means direct dev call
         if prefix not in self._registry.keys() or dev_override:
+            if prefix not in self._registry:
+                self._key_paths = None
             self._registry[prefix] = entry_inst
+            self._trie.add(prefix)
+            self._cntx_stack.index_prefix(prefix)
 
             # CLSS is here to cater for the instantiation of the class
             if entry_inst.reg_item_type in [RegItemType.FUNC, RegItemType.MTHD]:
@@ -416,36 +842,205 @@ class Registry:
         return self._registry[prefix].item
 
     def register(self, item: Union[Callable, str], by_dev: bool = True) -> None:
+        if self.deferred:
+            return self._defer(item, by_dev)
         try:
             return self._register(item, dev_override=by_dev)
         except:
             return item
 
-    def load_dev_configs(self, force=False, target=None) -> Dict:
-        if self._loaded_dev_configs is not None and not force:
-            return self._loaded_dev_configs
-
-        sorted_prefixes = sorted(
-            [prefix for prefix in self._registry.keys()],
-            key=lambda x: len(".".join(x).split(".")),
-        )
-
+    def _defer(self, item: Union[Callable, str], by_dev: bool):
+        # only cheap wrapping happens now; modules are neither imported nor walked
+        try:
+            if isinstance(item, str) or inspect.ismodule(item):
+                m = sys.modules.get(item) if isinstance(item, str) else item
+                if m is not None:
+                    wrap_module_lazily(m, self)
+            elif inspect.isclass(item):
+                item = _register_class(item, self._cntx_stack, deferred=True)
+            elif inspect.isfunction(item):
+                item = _defer_func(item, self._cntx_stack)
+        except Exception:
+            return item
+        with self._pending_lock:
+            self._pending.append((item, by_dev))
+        return item
+
+    def flush(self) -> None:
+        """Completes the deferred registrations in the order they were made."""
+        while self._pending:
+            # registering may import modules whose decorators defer items in turn;
+            # the lock is released first so that they never wait for each other
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            for item, by_dev in pending:
+                try:
+                    self._register(item, dev_override=by_dev)
+                except Exception as e:
+                    logger.debug(f"failed to register {item!r}: {e}")
+
+    def get_key_paths(self):
+        """Returns the key paths of the registered prefixes as a frozenset of tuples."""
+        key_paths = self._key_paths
+        if key_paths is None:
+            key_paths = frozenset(_prefix_parts(prefix) for prefix in self._trie)
+            self._key_paths = key_paths
+        return key_paths
+
+    def invalidate_dev_configs(self, target=_ALL_TARGETS) -> None:
+        """
+        Drops the cached developer configs.
+
+        Args:
+            target (str, optional): Only drop the configs of this target (None for
+                the base configs). Drops all of them if not given.
+        """
+        if target is _ALL_TARGETS:
+            self._dev_configs_cache.clear()
+        else:
+            self._dev_configs_cache.pop(target, None)
+
+    def get_prefixes_under(self, prefix: str) -> List[str]:
+        """
+        Returns the registered prefixes under `prefix` (e.g. a package).
+
+        Args:
+            prefix (str): The prefix; "" for all registered prefixes.
+
+        Returns:
+            list: The prefixes, ancestors first; `prefix` itself if registered.
+        """
+        node = self._trie.find(prefix)
+        return list(node) if node is not None else []
+
+    def _get_dev_config_files(self, target=None, prefixes=None) -> List:
+        """
+        Returns `(path, prefix)` of the existing dev config files of `target`.
+
+        The files are in merge order, i.e. those of ancestors come first.
+
+        Args:
+            target (str, optional): The target environment; None for the base files.
+            prefixes (list, optional): Only the files of these prefixes, given
+                ancestors first; all registered prefixes by default.
+        """
+        self.flush()
+        prefixes = self._trie if prefixes is None else prefixes
         sorted_reg_items: List[RegItem] = [
-            self._registry[prefix] for prefix in sorted_prefixes
+            self._registry[prefix] for prefix in prefixes
         ]
 
-        configs = {}
+        # Most conventional file names do not exist; they are skipped by their
+        # directory's listing, so that a new file still changes the result.
+        files = []
+        listings = {}
+        target_key = target if target is not None else ""
         for reg_item in sorted_reg_items:
             dev_config_path = reg_item.get_dev_config_paths(target=target)
             logger.debug(
                 f"dev_config_path of {reg_item.get_cname()} is {dev_config_path}"
             )
-            if target is None:
-                target = ""
-            if target is not None and target in dev_config_path:
-                configs = load_and_merge_configs(
-                    dev_config_path[target], configs, reg_item.prefix
-                )
+            if target_key in dev_config_path and probe_config_file(
+                dev_config_path[target_key], listings
+            ):
+                files.append((dev_config_path[target_key], reg_item.prefix))
+        return files
+
+    def load_item_dev_configs(
+        self, prefix: str, target=None, sources: SourceFiles = None
+    ) -> Dict:
+        """
+        Loads the developer configs of one item.
+
+        Only the dev config files of the items registered as `prefix` or as one
+        of its ancestors are read, and they are merged in the same order as by
+        `load_dev_configs`, so the result equals its configs under `prefix`.
+
+        Args:
+            prefix (str): The prefix of the item.
+            target (str, optional): The target environment; None for the base configs.
+            sources (SourceFiles, optional): Records the contributing files.
+
+        Returns:
+            dict: The merged developer configs under `prefix`.
+        """
+        ancestors = self._trie.get_ancestors(prefix)
+        if not ancestors:
+            return {}
+
+        files = self._get_dev_config_files(target=None, prefixes=ancestors)
+        if target is not None:
+            files += self._get_dev_config_files(target=target, prefixes=ancestors)
 
-        self._loaded_dev_configs = configs
+        configs = {}
+        for path, file_prefix in files:
+            cfgs, file_sources = _load_dev_config_file(path)
+            if sources is not None:
+                sources.update(file_sources)
+            if cfgs is None:
+                continue
+            configs = merge_dictionaries(
+                configs, create_prefixed_tree(cfgs, file_prefix)
+            )
+        kw_args = get_from_prefixed_tree(configs, _prefix_parts(prefix))
+        return kw_args if isinstance(kw_args, dict) else {}
+
+    def load_dev_configs(
+        self, force=False, target=None, sources: SourceFiles = None
+    ) -> Dict:
+        """
+        Loads and merges the developer configs of all registered items.
+
+        The result is cached per target and reused as long as the stat signatures
+        (inode, size and mtime) of the contributing files are unchanged.
+
+        Args:
+            force (bool): Reload the configs even if the cached ones are valid.
+            target (str, optional): The target environment; None for the base configs.
+            sources (SourceFiles, optional): Records the contributing files.
+
+        Returns:
+            dict: The merged developer configs; a copy of the cached ones, so
+                injected values mutated by a call do not leak into other contexts.
+        """
+        self.flush()
+        files = self._get_dev_config_files(target=target)
+
+        cached = self._dev_configs_cache.get(target, None)
+        if (
+            not force
+            and cached is not None
+            and cached[0] == files
+            and cached[1].is_fresh()
+        ):
+            if sources is not None:
+                sources.update(cached[1])
+            return copy_configs(cached[2])
+
+        # files are read and parsed concurrently but merged in order
+        paths = [path for path, _ in files]
+        workers = min(self.max_workers, len(paths))
+        if workers > 1 and len(paths) >= self.parallel_threshold:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="pyconject"
+            ) as executor:
+                results = list(executor.map(_load_dev_config_file, paths))
+        else:
+            results = [_load_dev_config_file(path) for path in paths]
+
+        configs = {}
+        dev_sources = SourceFiles()
+        for (_, prefix), (cfgs, file_sources) in zip(files, results):
+            dev_sources.update(file_sources)
+            if cfgs is None:
+                continue
+            configs = merge_dictionaries(configs, create_prefixed_tree(cfgs, prefix))
+
+        if dev_sources.cacheable:
+            self._dev_configs_cache[target] = (files, dev_sources, configs)
+            configs = copy_configs(configs)
+        if sources is not None:
+            sources.update(dev_sources)
         return configs
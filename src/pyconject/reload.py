@@ -0,0 +1,178 @@
+"""
+Hot reloading of client configs for `pyconject`.
+
+A `ConfigWatcher` keeps track of the contexts entered while it is enabled and
+polls the stat signatures of their client config files (including referenced
+and missing ones). When a file changes, only that file is re-read, the layers
+of the affected contexts are merged anew and the result is swapped into the
+live contexts in one step, so wrapped calls see either the old or the new
+configs but never a partially merged mix.
+
+On Linux, the watcher sleeps on inotify events of the config directories when
+the optional `inotify_simple` package is installed; the changes themselves are
+always detected by comparing stat signatures. A pipe wakes the sleeping thread
+up when the watcher is stopped or a new context is tracked, so that stopping
+does not wait for the interval and new directories are watched right away.
+"""
+
+import itertools
+import logging
+import os
+import select
+import threading
+import time
+import weakref
+
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:  # optional, polling only
+    INotify = None
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+
+class ConfigWatcher:
+    """
+    Reloads the client configs of live contexts when their files change.
+
+    Attributes:
+        cntx_stack (CntxStack): The context stack whose frames are reloaded.
+        interval (float): The number of seconds between two checks.
+        reloads (int): The number of frames reloaded so far.
+    """
+
+    def __init__(self, cntx_stack, interval: float = 1.0):
+        self.cntx_stack = cntx_stack
+        self.interval = interval
+        self.reloads = 0
+        self._frames = weakref.WeakValueDictionary()  # push number -> frame
+        self._numbers = itertools.count()
+        self._lock = threading.Lock()  # guards `_frames`
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._inotify = None
+        self._watched = set()
+        self._wake_fds = None  # (read end, write end) of the wake-up pipe
+
+    def track(self, frame) -> None:
+        """Reloads `frame` on changes for as long as it is in use."""
+        with self._lock:
+            self._frames[next(self._numbers)] = frame
+            self._wake()  # watch the directories of `frame` as well
+
+    def check(self) -> int:
+        """
+        Reloads the tracked frames whose files changed.
+
+        Frames are checked in the order they were pushed, so that nested
+        contexts are rebuilt on top of the reloaded configs of their parents.
+
+        Returns:
+            int: The number of frames reloaded.
+        """
+        with self._lock:
+            frames = [frame for _, frame in sorted(self._frames.items())]
+        with self._reload_lock:
+            reloaded = 0
+            for frame in frames:
+                try:
+                    if self.cntx_stack.reload(frame):
+                        reloaded += 1
+                except Exception as e:
+                    logger.warning(f"Failed to reload configs, keeping them: {e}")
+            self.reloads += reloaded
+        if reloaded:
+            logger.info(f"reloaded the configs of {reloaded} context(s)")
+        return reloaded
+
+    def start(self) -> "ConfigWatcher":
+        """Starts checking for changes on a daemon thread; returns the watcher."""
+        if self._thread is None:
+            self._stop.clear()
+            if INotify is not None:
+                try:
+                    self._inotify = INotify()
+                except OSError:
+                    self._inotify = None
+                else:
+                    self._wake_fds = os.pipe()
+                    os.set_blocking(self._wake_fds[1], False)
+            self._thread = threading.Thread(
+                target=self._run, name="pyconject-watcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops the checking thread."""
+        self._stop.set()
+        with self._lock:
+            self._wake()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify, self._watched = None, set()
+        with self._lock:
+            if self._wake_fds is not None:
+                for fd in self._wake_fds:
+                    os.close(fd)
+                self._wake_fds = None
+
+    def _wake(self):
+        # callers hold `_lock`, so that `stop` cannot close the pipe meanwhile
+        if self._wake_fds is not None:
+            try:
+                os.write(self._wake_fds[1], b"\0")
+            except BlockingIOError:
+                pass  # the pipe is full, the thread is woken up anyway
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wait()
+            if not self._stop.is_set():
+                self.check()
+
+    def _wait(self):
+        if self._inotify is None:
+            self._stop.wait(self.interval)
+            return
+        wake_fd = self._wake_fds[0]
+        deadline = time.monotonic() + self.interval
+        while not self._stop.is_set():
+            self._watch_directories()
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                return
+            ready, _, _ = select.select([self._inotify, wake_fd], [], [], timeout)
+            if wake_fd in ready:  # stopped or a frame was tracked
+                os.read(wake_fd, 4096)
+            if self._inotify in ready:  # a config directory changed
+                self._inotify.read(timeout=0, read_delay=50)
+                return
+            if not ready:
+                return
+
+    def _watch_directories(self):
+        with self._lock:
+            frames = list(self._frames.values())
+        directories = {
+            os.path.dirname(os.path.abspath(path))
+            for frame in frames
+            for path in frame.provider.sources.stamps
+        }
+        mask = (
+            inotify_flags.CLOSE_WRITE
+            | inotify_flags.MOVED_TO
+            | inotify_flags.CREATE
+            | inotify_flags.DELETE
+        )
+        for directory in directories - self._watched:
+            try:
+                self._inotify.add_watch(directory, mask)
+                self._watched.add(directory)
+            except OSError:
+                pass  # e.g. the directory does not exist (yet)
@@ -0,0 +1,98 @@
+"""
+On-disk snapshots of merged configs for `pyconject`.
+
+A snapshot holds the fully merged and reference-resolved configs of an outermost
+context for a given `(config_path, target)` together with the stat signatures
+of every file that contributed to them. Fresh processes load a valid snapshot
+with a single binary read instead of parsing all dev and client config files.
+Snapshots are pickles (see `pyconject.pickles`).
+"""
+
+from pathlib import Path
+import logging
+import os
+
+from .cache import SourceFiles, is_fresh
+from .pickles import dump_pickle, load_pickle
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+_SNAPSHOT_VERSION = 1
+
+
+def snapshot_key(config_path=None, target=None) -> tuple:
+    """Returns the key of the snapshot of `config_path` and `target`."""
+    if config_path is None:
+        config_path = "./configs.yml"
+    if isinstance(config_path, dict):
+        config_path = tuple(
+            sorted((k, os.path.abspath(v)) for k, v in config_path.items())
+        )
+    else:
+        config_path = os.path.abspath(config_path)
+    return (config_path, target)
+
+
+class SnapshotStore:
+    """
+    Directory of config snapshots.
+
+    Attributes:
+        directory (Path): The directory the snapshots are stored in.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def _get_path(self, key: tuple) -> Path:
+        import hashlib
+
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.pickle"
+
+    def load(self, key: tuple, files) -> dict:
+        """
+        Loads the configs of a snapshot if it is still valid.
+
+        Args:
+            key (tuple): The key from `snapshot_key`.
+            files: The dev config files the configs would be loaded from; the
+                snapshot is only valid for the same files (i.e. registry).
+
+        Returns:
+            dict: The configs, or None if there is no valid snapshot.
+        """
+        snapshot = load_pickle(self._get_path(key), f"config snapshot for {key}")
+        if (
+            snapshot is None
+            or snapshot.get("version") != _SNAPSHOT_VERSION
+            or snapshot.get("key") != key
+            or snapshot.get("files") != files
+            or not is_fresh(snapshot["stamps"])
+        ):
+            return None
+        return snapshot["configs"]
+
+    def save(self, key: tuple, files, sources: SourceFiles, configs: dict) -> bool:
+        """
+        Stores a snapshot of `configs` unless `sources` are not cacheable.
+
+        Returns:
+            bool: Whether the snapshot was written.
+        """
+        if not sources.cacheable:
+            return False
+        snapshot = {
+            "version": _SNAPSHOT_VERSION,
+            "key": key,
+            "files": files,
+            "stamps": dict(sources.stamps),
+            "configs": configs,
+        }
+        try:
+            dump_pickle(self._get_path(key), snapshot)
+        except Exception as e:
+            logger.warning(f"Failed to write config snapshot for {key}: {e}")
+            return False
+        return True
@@ -5,15 +5,19 @@ This module provides helper functions for merging dictionaries, resolving
 references, and managing configurations.
 """
 
-from typing import Dict
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
 
 from pathlib import Path
-import re
+import fnmatch
 import inspect
-import yaml
+import os
 
 import logging
 
+from .cache import SourceFiles, directory_listings, parsed_file_cache, stat_signature
+from .loaders import CONFIG_SUFFIXES, get_parser
+from .references import ReferenceResolver
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
@@ -38,6 +42,28 @@ def merge_dictionaries(dict1, dict2) -> dict:
     return merged
 
 
+def copy_configs(configs):
+    """
+    Copies a config tree so that the values handed out can be mutated safely.
+
+    Dictionaries are copied recursively; other mutable containers (lists and
+    sets) are deep-copied. Immutable values are shared.
+
+    Args:
+        configs: The config tree (or a single value).
+
+    Returns:
+        The copy.
+    """
+    if isinstance(configs, dict):
+        return {key: copy_configs(value) for key, value in configs.items()}
+    if isinstance(configs, (list, set)):
+        import copy
+
+        return copy.deepcopy(configs)
+    return configs
+
+
 def create_prefixed_tree(cfg: Dict, prefix: str) -> Dict:
     parts = prefix.split(".")
     tree = cfg
@@ -47,8 +73,8 @@ def create_prefixed_tree(cfg: Dict, prefix: str) -> Dict:
     return tree
 
 
-def get_from_prefixed_tree(tree: Dict, prefix: str):
-    parts = prefix.split(".")
+def get_from_prefixed_tree(tree: Dict, prefix: Union[str, Sequence[str]]):
+    parts = prefix.split(".") if isinstance(prefix, str) else prefix
     for part in parts:
         if isinstance(tree, dict) and part in tree:
             tree = tree[part]
@@ -68,90 +94,137 @@ def init_default_dev_configs(
     return _dict
 
 
-def resolve_reference(reference: str, config_path: Path) -> any:
+def resolve_reference(
+    reference: str, config_path: Path, sources: SourceFiles = None
+) -> any:
     """
     Resolves a reference in the format "@path/to/file.yml:key1.key2".
 
+    References in the referenced value are resolved as well (see
+    `ReferenceResolver`).
+
     Args:
         reference (str): The reference string.
         config_path (Path): The path to the configuration file.
+        sources (SourceFiles, optional): Records the referenced file.
 
     Returns:
-        any: The resolved value.
+        any: The resolved value, or the reference itself if it cannot be resolved.
     """
-    if not reference.startswith("@"):
-        return reference  # Not a reference, return as is
+    resolver = ReferenceResolver(sources)
+    resolved = resolver.resolve_value(reference, Path(config_path))
+    resolver.report(config_path)
+    return resolved
 
-    if reference.startswith("@@"):
-        # This is a special case for escaped @ character
-        return reference[1:]
 
-    try:
-        # Extract file path and key path
-        match = re.match(r"@(.*?):(.*)", reference)
-        if not match:
-            # it is not a reference it seems
-            return reference
-
-        file_path, key_path = match.groups()
-
-        # Resolve relative paths
-        file_path = Path(file_path)
-        if not file_path.is_absolute():
-            file_path = config_path.parent / file_path
-
-        # Load the referenced YAML file
-        if file_path not in resolve_reference.yml_file_cache:
-            with open(file_path, "rt") as f:
-                resolve_reference.yml_file_cache[file_path] = yaml.safe_load(f)
-
-        referenced_data = resolve_reference.yml_file_cache[file_path]
-
-        # Traverse the key path to get the value
-        keys = key_path.split(".")
-        for key in keys:
-            if isinstance(referenced_data, dict) and key in referenced_data:
-                referenced_data = referenced_data[key]
-            else:
-                logger.warning(
-                    f"Key '{key}' not found in {file_path}. Returning the original reference."
-                )
-                # raise KeyError(f"Key path '{key_path}' not found in {file_path}")
-
-        return referenced_data
-    except Exception as e:
-        logger.warning(
-            f"Failed to resolve reference {reference}: {e}. Returning the original reference."
-        )
-        # Optionally, you can raise an error or return a default value
-        # raise RuntimeError(f"Failed to resolve reference {reference}: {e}")
+def resolve_references_in_dict(
+    data: dict, config_path: Path, sources: SourceFiles = None
+) -> dict:
+    """
+    Resolves the references in a dictionary, using `config_path` for relative paths.
+
+    `data` is left untouched (it may be shared through the parsed file cache);
+    a new dictionary is returned. Unresolved references are logged at once.
+    """
+    resolver = ReferenceResolver(sources)
+    resolved = resolver.resolve(data, config_path)
+    resolver.report(config_path)
+    return resolved
 
 
-resolve_reference.yml_file_cache = {}
+def find_config_file(config_path, sources: SourceFiles = None):
+    """
+    Returns the file to load for `config_path`.
+
+    If a `.yml` file does not exist, its `.json` and `.toml` siblings are tried
+    (e.g. `configs.json` for `configs.yml`). The missing files are recorded in
+    `sources` so that creating one of them invalidates the result.
+    """
+    path = Path(config_path)
+    if path.suffix != ".yml" or stat_signature(path) is not None:
+        return config_path
+    for suffix in CONFIG_SUFFIXES:
+        alt_path = path.with_suffix(suffix)
+        if stat_signature(alt_path) is not None:
+            if sources is not None:
+                sources.add(path, None, loaded=False)
+            return alt_path
+        if sources is not None:
+            sources.add(alt_path, None, loaded=False)
+    return config_path
+
+
+def probe_config_file(config_path, listings: Dict = None) -> bool:
+    """
+    Returns whether `config_path` or one of its alternatives exists.
 
+    Unlike `find_config_file`, the cached listing of the directory is checked
+    instead of the file itself (see `DirectoryListings`).
 
-def resolve_references_in_dict(data: dict, config_path: Path) -> dict:
+    Args:
+        config_path (str or Path): The path of the config file.
+        listings (dict, optional): Listings validated during the same batch.
     """
-    Recursively resolves references in a dictionary, using `config_path` for relative paths.
+    path = Path(config_path)
+    if directory_listings.exists(path, listings):
+        return True
+    if path.suffix != ".yml":
+        return False
+    return any(
+        directory_listings.exists(path.with_suffix(suffix), listings)
+        for suffix in CONFIG_SUFFIXES
+    )
+
+
+def load_configs(
+    config_path, sources: SourceFiles = None, key_paths: FrozenSet = None
+) -> Tuple[dict, Optional[Tuple[int, int, int]]]:
     """
-    for key, value in data.items():
-        if isinstance(value, str):
-            data[key] = resolve_reference(value, config_path)
-        elif isinstance(value, dict):
-            data[key] = resolve_references_in_dict(value, config_path)
-    return data
+    Loads a config file and resolves the references in it.
+
+    The format is chosen by the file extension (see `find_config_file` for the
+    alternatives of `.yml` files).
 
+    Args:
+        config_path (str or Path): The path of the config file.
+        sources (SourceFiles, optional): Records the file and the referenced files.
+        key_paths (frozenset of tuples, optional): Only load the subtrees under
+            these key paths (see `loaders.get_parser`).
 
-def load_and_merge_configs(config_path, configs, prefix=""):
+    Returns:
+        tuple: The configs and the stat signature of the file they were loaded
+            from. The signature is None if the file could not be stat-ed or
+            changed while being read, i.e. the configs must not be cached.
+    """
+    config_path = find_config_file(config_path, sources)
     try:
-        with open(config_path, "rt") as f:
-            cfgs = yaml.safe_load(f)
+        cfgs, stamp = parsed_file_cache.load(
+            config_path, get_parser(config_path, key_paths), variant=key_paths
+        )
+    except Exception:
+        if sources is not None:
+            sources.add(config_path, stat_signature(config_path), loaded=False)
+        raise
+    if sources is not None:
+        sources.add(config_path, stamp)
+
+    if cfgs is None:
+        cfgs = {}
+
+    # Resolve references in the loaded configuration
+    cfgs = resolve_references_in_dict(cfgs, Path(config_path), sources)
+    return cfgs, stamp
 
-        # Resolve references in the loaded configuration
-        cfgs = resolve_references_in_dict(cfgs, config_path)
 
+def load_and_merge_configs(
+    config_path, configs, prefix="", sources=None, key_paths=None
+):
+    try:
+        cfgs, _ = load_configs(config_path, sources, key_paths=key_paths)
         tmp = create_prefixed_tree(cfgs, prefix)
         configs = merge_dictionaries(configs, tmp)
+    except ImportError as e:  # e.g. the parser of the file's format is missing
+        logger.warning(f"Failed to load configs from {config_path}: {e}")
     except:
         pass
     return configs
@@ -194,6 +267,60 @@ def get_subs(module):
     return {n: v for n, v in vars(module).items() if _is_interest(v)}
 
 
+def _matches(name: str, patterns) -> bool:
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def find_package_modules(package, include=None, exclude=None) -> List[str]:
+    """
+    Returns the names of the modules of a package (itself included) to wrap.
+
+    The package is walked with `pkgutil` once. Sub-packages are listed from
+    their directories without importing them, and the qualified names are
+    matched against the patterns before anything is imported.
+
+    Args:
+        package (module): The imported package (or plain module).
+        include (list of str, optional): Glob patterns of the qualified names to
+            keep (e.g. "pkg.io.*"); all modules by default.
+        exclude (list of str, optional): Glob patterns of the names to skip;
+            matching sub-packages are not walked at all.
+
+    Returns:
+        list of str: The qualified names, parents before their sub-modules.
+    """
+    import pkgutil
+
+    include, exclude = include or ["*"], exclude or []
+    names = []
+    if _matches(package.__name__, exclude):
+        return names
+    if _matches(package.__name__, include):
+        names.append(package.__name__)
+
+    def _walk(path, prefix):
+        for info in pkgutil.iter_modules(path, prefix):
+            if _matches(info.name, exclude):
+                continue
+            if _matches(info.name, include):
+                names.append(info.name)
+            if info.ispkg:
+                finder_path = getattr(info.module_finder, "path", None)
+                if finder_path is not None:
+                    sub_path = [os.path.join(finder_path, info.name.split(".")[-1])]
+                else:  # e.g. zipped packages
+                    import importlib
+
+                    sub_path = getattr(
+                        importlib.import_module(info.name), "__path__", []
+                    )
+                _walk(sub_path, f"{info.name}.")
+
+    if hasattr(package, "__path__"):
+        _walk(list(package.__path__), f"{package.__name__}.")
+    return names
+
+
 class Stack:
     """
     A simple stack implementation.
@@ -0,0 +1,106 @@
+"""
+Filtered composition of YAML documents for `pyconject`.
+
+Imported by `pyconject.loaders` only when a config file is first parsed
+restricted to a set of key paths, so that PyYAML is not loaded before it is
+needed.
+"""
+
+import yaml
+from yaml.composer import Composer
+from yaml.constructor import SafeConstructor
+from yaml.events import (
+    AliasEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+)
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+
+class FilteringLoader(Composer, SafeConstructor, Resolver):
+    """
+    Composes only the wanted subtrees of a YAML document.
+
+    The events come from a regular loader (LibYAML based or not); the values of
+    unwanted mapping keys are skipped event by event without building nodes.
+    Anchored nodes are always composed so that later aliases still resolve.
+    """
+
+    def __init__(self, stream, trie: dict, loader: type):
+        self._parser = loader(stream)
+        Composer.__init__(self)
+        SafeConstructor.__init__(self)
+        Resolver.__init__(self)
+        self._tries = [trie]
+
+    def check_event(self, *choices):
+        return self._parser.check_event(*choices)
+
+    def peek_event(self):
+        return self._parser.peek_event()
+
+    def get_event(self):
+        return self._parser.get_event()
+
+    def dispose(self):
+        self._parser.dispose()
+
+    def _compose_unfiltered(self, parent, index):
+        self._tries.append(None)
+        try:
+            return self.compose_node(parent, index)
+        finally:
+            self._tries.pop()
+
+    def compose_mapping_node(self, anchor):
+        trie = self._tries[-1]
+        if trie is None:
+            return super().compose_mapping_node(anchor)
+
+        start_event = self.get_event()
+        tag = start_event.tag
+        if tag is None or tag == "!":
+            tag = self.resolve(yaml.MappingNode, None, start_event.implicit)
+        node = yaml.MappingNode(
+            tag, [], start_event.start_mark, None, flow_style=start_event.flow_style
+        )
+        if anchor is not None:
+            self.anchors[anchor] = node
+        while not self.check_event(MappingEndEvent):
+            item_key = self._compose_unfiltered(node, None)
+            key = item_key.value if isinstance(item_key, ScalarNode) else None
+            if key == "<<":  # merge keys may bring wanted subtrees
+                item_value = self._compose_unfiltered(node, item_key)
+            elif key in trie:
+                sub_trie = trie[key] if self.check_event(MappingStartEvent) else None
+                self._tries.append(sub_trie)
+                try:
+                    item_value = self.compose_node(node, item_key)
+                finally:
+                    self._tries.pop()
+            else:
+                self._skip_node()
+                continue
+            node.value.append((item_key, item_value))
+        end_event = self.get_event()
+        node.end_mark = end_event.end_mark
+        return node
+
+    def _skip_node(self):
+        event = self.peek_event()
+        if not isinstance(event, AliasEvent) and event.anchor is not None:
+            self._compose_unfiltered(None, None)
+            return
+        event = self.get_event()
+        if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+            end = (
+                MappingEndEvent
+                if isinstance(event, MappingStartEvent)
+                else SequenceEndEvent
+            )
+            while not self.check_event(end):
+                self._skip_node()
+            self.get_event()
@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+import tempfile
+import yaml
+
+from pyconject.cache import DirectoryListings, ParsedFileCache
+
+
+class ParsedFileCacheTest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(3):
+            path = Path(self.tmp_dir.name) / f"cfg-{i}.yml"
+            path.write_text(f"value: {i}\n")
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_hits_and_misses(self):
+        cache = ParsedFileCache()
+        assert cache.load(self.paths[0], yaml.safe_load)[0] == {"value": 0}
+        assert cache.load(self.paths[0], yaml.safe_load)[0] == {"value": 0}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_entry_reloaded(self):
+        cache = ParsedFileCache()
+        cache.load(self.paths[0], yaml.safe_load)
+        self.paths[0].write_text("value: changed\n")
+        assert cache.load(self.paths[0], yaml.safe_load)[0] == {"value": "changed"}
+        assert cache.stats()["misses"] == 2
+        assert len(cache) == 1
+
+    def test_lru_eviction(self):
+        cache = ParsedFileCache(max_entries=2)
+        for path in self.paths:
+            cache.load(path, yaml.safe_load)
+        assert len(cache) == 2
+        assert cache.evictions == 1
+
+        size = os.stat(self.paths[0]).st_size
+        cache = ParsedFileCache(max_bytes=2 * size)
+        cache.load(self.paths[0], yaml.safe_load)
+        cache.load(self.paths[1], yaml.safe_load)
+        cache.load(self.paths[0], yaml.safe_load)  # most recently used
+        cache.load(self.paths[2], yaml.safe_load)
+        assert cache.stats()["bytes"] == 2 * size
+        assert cache.load(self.paths[0], yaml.safe_load)[1] is not None
+        assert cache.stats()["hits"] == 2
+
+    def test_missing_file_not_cached(self):
+        cache = ParsedFileCache()
+        with self.assertRaises(FileNotFoundError):
+            cache.load(Path(self.tmp_dir.name) / "missing.yml", yaml.safe_load)
+        assert len(cache) == 0
+
+
+class DirectoryListingsTest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+        (self.directory / "pyconject.yml").write_text("a: 1\n")
+        os.utime(self.directory, ns=(10**18, 10**18))  # not modified recently
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_listing_cached(self):
+        listings = DirectoryListings()
+        assert listings.exists(self.directory / "pyconject.yml")
+        with patch("os.scandir") as scandir:
+            assert not listings.exists(self.directory / "pyconject-dev.yml")
+            scandir.assert_not_called()
+        assert listings.scans == 1
+
+    def test_listing_refreshed(self):
+        listings = DirectoryListings()
+        assert not listings.exists(self.directory / "pyconject-dev.yml")
+        (self.directory / "pyconject-dev.yml").write_text("a: 2\n")
+        assert listings.exists(self.directory / "pyconject-dev.yml")
+        assert listings.scans == 2
+        assert len(listings) == 1
+
+    def test_recently_modified_not_cached(self):
+        listings = DirectoryListings()
+        (self.directory / "pyconject-dev.yml").write_text("a: 2\n")
+        assert listings.exists(self.directory / "pyconject-dev.yml")
+        assert len(listings) == 0
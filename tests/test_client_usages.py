@@ -8,7 +8,11 @@ import yaml
 from pyconject import pyconject
 from pyconject.context import CntxStack
 
-from unittest_utils import get_dynamic_mock_open, remove_file_or_directory
+from unittest_utils import (
+    get_dynamic_mock_open,
+    remove_file_or_directory,
+    save_namespace,
+)
 from black_p.black_sp.black_m import black_func, BlackClass
 from dev_p.dev_sp.dev_m import dev_func_m
 
@@ -47,8 +51,10 @@ class ClientUsageTest(TestCase):
             pyconject._cntx_stack.config_stack.pop()
         while len(pyconject._cntx_stack.target_stack) > 0:
             pyconject._cntx_stack.target_stack.pop()
+        self.restore_globals = save_namespace(globals())
 
     def tearDown(self) -> None:
+        self.restore_globals()
         remove_file_or_directory(Path("tests/cfgs.yml"))
         return super().tearDown()
 
@@ -0,0 +1,80 @@
+from pathlib import Path
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import tempfile
+import threading
+import yaml
+
+from pyconject import pyconject
+
+
+def conc_func(a):
+    return a
+
+
+class ConcurrencyTest(TestCase):
+
+    def setUp(self):
+        while len(pyconject._cntx_stack.config_stack) > 0:
+            pyconject._cntx_stack.config_stack.pop()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_paths = []
+        for i in range(2):
+            config_path = Path(self.tmp_dir.name) / f"configs-{i}.yml"
+            with open(config_path, "wt") as f:
+                yaml.safe_dump({"test_concurrency": {"conc_func": {"a": i}}}, f)
+            self.config_paths.append(config_path)
+        self.wrapped = pyconject.wrap(conc_func)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_threads(self):
+        barrier = threading.Barrier(2)
+        depth = len(pyconject._cntx_stack.config_stack)
+
+        def handler(i):
+            with pyconject.cntx(config_path=self.config_paths[i]):
+                barrier.wait()  # both threads are inside their contexts
+                result = self.wrapped()
+                barrier.wait()
+            return result, len(pyconject._cntx_stack.config_stack)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(handler, range(2)))
+
+        assert results == [(0, 0), (1, 0)]
+        assert len(pyconject._cntx_stack.config_stack) == depth
+
+    def test_asyncio_tasks(self):
+        async def handler(i, event):
+            with pyconject.cntx(config_path=self.config_paths[i]):
+                if i == 0:
+                    await event.wait()
+                else:
+                    event.set()
+                return self.wrapped()
+
+        async def main():
+            event = asyncio.Event()
+            return await asyncio.gather(handler(0, event), handler(1, event))
+
+        assert asyncio.run(main()) == [0, 1]
+
+    def test_carry_cntx(self):
+        def worker():
+            return self.wrapped(), len(pyconject._cntx_stack.config_stack)
+
+        with pyconject.cntx(config_path=self.config_paths[1]):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                carried = pyconject.carry_cntx(worker)
+                results = [executor.submit(carried) for _ in range(4)]
+                assert [r.result() for r in results] == [(1, 1)] * 4
+
+                # without it, `a` is not configured in the thread's default context
+                with self.assertLogs("pyconject.context", "WARNING") as logs:
+                    with self.assertRaises(TypeError):
+                        executor.submit(worker).result()
+                assert "carry_cntx" in logs.output[0]
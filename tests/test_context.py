@@ -0,0 +1,391 @@
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import importlib
+import os
+import select
+import shutil
+import sys
+import tempfile
+import time
+
+from pyconject import context, pyconject, reload
+from pyconject.cache import parsed_file_cache
+from pyconject.providers import EnvironmentProvider
+from pyconject.registry import Registry
+from pyconject.snapshot import snapshot_key
+
+
+@pyconject.func
+def env_func(a, b=None):
+    return a, b
+
+
+@pyconject.clss
+class EnvClass:
+    def __init__(self, a, b=None):
+        self.a, self.b = a, b
+
+
+class CntxTest(TestCase):
+
+    def setUp(self):
+        while len(pyconject._cntx_stack.config_stack) > 0:
+            pyconject._cntx_stack.config_stack.pop()
+
+    def test_caller_globals(self):
+        with patch("inspect.getframeinfo") as getframeinfo:
+            cntx = pyconject.cntx()
+            getframeinfo.assert_not_called()
+        assert cntx.glb is globals()
+
+        # code of a sibling package is a caller, not part of pyconject
+        filename = os.path.join(context._PACKAGE_DIR.rstrip(os.sep) + "_ext", "m.py")
+        namespace = {"pyconject": pyconject}
+        exec(compile("cntx = pyconject.cntx()", filename, "exec"), namespace)
+        assert namespace["cntx"].glb is namespace
+
+    def test_dev_configs_cached(self):
+        registry = pyconject._cntx_stack.registry
+        registry.invalidate_dev_configs()
+        from dev_p.dev_sp.dev_m import dev_func  # noqa: F401 registers dev_p
+
+        configs = registry.load_dev_configs()
+        with patch("pyconject.registry.load_configs") as load_configs:
+            assert registry.load_dev_configs() == configs
+            load_configs.assert_not_called()
+
+        pyconject.invalidate_dev_configs()
+        assert not registry._dev_configs_cache
+        assert registry.load_dev_configs() == configs
+
+    def import_dev_p_copy(self, tmp_dir, name):
+        """Imports a copy of the `dev_p` test package as `name`."""
+        shutil.copytree(
+            Path(__file__).parent / "dev_p",
+            Path(tmp_dir) / name,
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+        sys.path.insert(0, tmp_dir)
+        self.addCleanup(sys.path.remove, tmp_dir)
+        for module in [f"{name}", f"{name}.dev_sp", f"{name}.dev_sp.dev_m"]:
+            self.addCleanup(sys.modules.pop, module, None)
+        return importlib.import_module(f"{name}.dev_sp.dev_m")
+
+    def test_dev_configs_refreshed_on_change(self):
+        registry = pyconject._cntx_stack.registry
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.import_dev_p_copy(tmp_dir, "refreshed_p")
+            configs = registry.load_dev_configs()
+            path = Path(tmp_dir) / "refreshed_p/dev_sp/pyconject-dev_m-dev_func_m.yml"
+            path.write_text("a: 'changed'\n")
+            changed = registry.load_dev_configs()
+            dev_m = changed["refreshed_p"]["dev_sp"]["dev_m"]
+            assert dev_m["dev_func_m"]["a"] == "changed"
+            assert (
+                configs["refreshed_p"]["dev_sp"]["dev_m"]["dev_func_m"]["a"] == 100001
+            )
+
+    def test_dev_configs_not_shared(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dev_m = self.import_dev_p_copy(tmp_dir, "mutated_p")
+            path = Path(tmp_dir) / "mutated_p/dev_sp/pyconject-dev_m-dev_func_m.yml"
+            path.write_text("a: [1]\n")
+            for _ in range(3):
+                with pyconject.cntx():
+                    a, _, _, _ = dev_m.dev_func_m()
+                    assert a == [1]
+                    a.append(7)
+
+    def test_client_configs_not_shared(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = Path(tmp_dir) / "configs.yml"
+            config_path.write_text("test_context:\n  env_func:\n    a: [1, 2]\n")
+            with patch.dict(os.environ, {}, clear=True):
+                for _ in range(3):
+                    with pyconject.cntx(config_path=config_path):
+                        a, _ = env_func()
+                        assert a == [1, 2]
+                        a.append(99)
+
+    def test_dev_configs_missing_files_skipped(self):
+        registry = pyconject._cntx_stack.registry
+        from dev_p.dev_sp.dev_m import dev_func  # noqa: F401 registers dev_p
+
+        with patch("pyconject.registry.load_configs") as load_configs:
+            load_configs.return_value = ({}, None)
+            registry.load_dev_configs(force=True, target="dev")
+        paths = [c.args[0] for c in load_configs.call_args_list]
+        assert paths and all(Path(path).exists() for path in paths)
+
+    def test_dev_configs_parallel(self):
+        registry = pyconject._cntx_stack.registry
+        from dev_p.dev_sp.dev_m import dev_func  # noqa: F401 registers dev_p
+
+        workers, threshold = registry.max_workers, registry.parallel_threshold
+        try:
+            pyconject.set_dev_config_workers(1)
+            serial = registry.load_dev_configs(force=True, target="dev")
+            pyconject.set_dev_config_workers(4)
+            registry.parallel_threshold = 1
+            with patch("concurrent.futures.ThreadPoolExecutor") as executor:
+                executor.side_effect = ThreadPoolExecutor
+                parallel = registry.load_dev_configs(force=True, target="dev")
+                executor.assert_called_once()
+        finally:
+            registry.max_workers, registry.parallel_threshold = workers, threshold
+        assert parallel == serial
+        assert list(parallel) == list(serial)
+
+        with patch.dict(os.environ, {"PYCONJECT_DEV_CONFIG_WORKERS": "many"}):
+            with self.assertLogs("pyconject.registry", "WARNING"):
+                assert Registry(pyconject._cntx_stack).max_workers == 1
+        with self.assertRaises(ValueError):
+            pyconject.set_dev_config_workers(0)
+
+    def test_lazy_dev_configs(self):
+        from dev_p.dev_sp.dev_m import dev_func, dev_func_sp_custom2
+
+        registry = pyconject._cntx_stack.registry
+        with pyconject.cntx(target="dev"):
+            eager = (dev_func(1, 2), dev_func_sp_custom2())
+
+        pyconject.set_lazy_dev_configs()
+        try:
+            with patch.object(
+                registry,
+                "load_item_dev_configs",
+                wraps=registry.load_item_dev_configs,
+            ) as load:
+                with pyconject.cntx(target="dev") as cntx:
+                    load.assert_not_called()
+                    assert "dev_p" not in cntx.cntx_stack.get_configs()
+                    with pyconject.cntx():
+                        lazy = (dev_func(1, 2), dev_func_sp_custom2())
+                    assert dev_func(1, 2) == eager[0]
+                loaded = [c.args[0] for c in load.call_args_list]
+                assert loaded == [
+                    "dev_p.dev_sp.dev_m.dev_func",
+                    "dev_p.dev_sp.dev_m.dev_func_sp_custom2",
+                ]
+        finally:
+            pyconject.set_lazy_dev_configs(False)
+        assert lazy == eager
+
+    def test_nested_shares_parent(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            base_path = Path(tmp_dir) / "configs.yml"
+            base_path.write_text(
+                "test_context:\n  env_func:\n    a: 1\n    b: 2\n"
+                "big_p:\n  big_func:\n    a: [1, 2, 3]\n"
+            )
+            override_path = Path(tmp_dir) / "override.yml"
+            override_path.write_text("test_context:\n  env_func:\n    b: 3\n")
+            with patch.dict(os.environ, {}, clear=True):
+                with pyconject.cntx(config_path=base_path) as outer:
+                    outer_configs = outer.cntx_stack.get_configs()
+                    outer_index = outer.cntx_stack.get_index()
+                    with pyconject.cntx(config_path=override_path) as inner:
+                        inner_configs = inner.cntx_stack.get_configs()
+                        inner_index = inner.cntx_stack.get_index()
+                        assert env_func() == (1, 3)
+                        assert inner_configs["big_p"] is outer_configs["big_p"]
+                        assert inner_index.get("big_p.big_func") is outer_index.get(
+                            "big_p.big_func"
+                        )
+                        assert "big_p" not in inner_index.overrides
+                    assert env_func() == (1, 2)
+                    assert outer_configs["test_context"]["env_func"]["b"] == 2
+
+    def test_index_overrides(self):
+        parent = context.ConfigIndex({"dev_p": {"a": 1}}, 1)
+        index = context.ConfigIndex(
+            {"dev_p": {"a": 2}}, 2, parent=parent, overrides={"dev_p": {"a": 2}}
+        )
+        assert index._is_overridden("dev_p.a")
+        assert index._is_overridden(".dev_p")  # top-level packages
+        assert not index._is_overridden("other_p.func")
+
+    def test_client_config_filtering(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = Path(tmp_dir) / "configs.yml"
+            config_path.write_text(
+                "test_context:\n  env_func:\n    a: 1\n    b: 2\n"
+                "unregistered_p:\n  func:\n    a: 3\n"
+            )
+            pyconject.set_client_config_filtering()
+            try:
+                with patch.dict(os.environ, {}, clear=True):
+                    with pyconject.cntx(config_path=config_path) as cntx:
+                        configs = cntx.cntx_stack.get_configs()
+                        assert env_func() == (1, 2)
+                        assert "unregistered_p" not in configs
+            finally:
+                pyconject.set_client_config_filtering(False)
+            with pyconject.cntx(config_path=config_path) as cntx:
+                assert "unregistered_p" in cntx.cntx_stack.get_configs()
+
+    def test_hot_reload(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = Path(tmp_dir) / "configs.yml"
+            config_path.write_text("test_context:\n  env_func:\n    a: 1\n    b: 2\n")
+            nested_path = Path(tmp_dir) / "nested.yml"
+            nested_path.write_text("test_context:\n  env_func:\n    b: 20\n")
+            pyconject.set_hot_reload(interval=3600)  # checked explicitly below
+            watcher = pyconject._cntx_stack.watcher
+            try:
+                with patch.dict(os.environ, {}, clear=True):
+                    with pyconject.cntx(config_path=config_path, target="dev"):
+                        with pyconject.cntx(config_path=nested_path):
+                            assert env_func() == (1, 20)
+                            assert watcher.check() == 0
+
+                            # only the changed file is parsed again
+                            misses = parsed_file_cache.misses
+                            config_path.write_text(
+                                "test_context:\n  env_func:\n    a: 33\n    b: 2\n"
+                            )
+                            assert watcher.check() == 2  # nested on top of outer
+                            assert parsed_file_cache.misses == misses + 1
+                            assert env_func() == (33, 20)
+                        assert env_func() == (33, 2)
+
+                        # files that did not exist are watched as well
+                        (Path(tmp_dir) / "configs-dev.yml").write_text(
+                            "test_context:\n  env_func:\n    b: 5\n"
+                        )
+                        assert watcher.check() == 1
+                        assert env_func() == (33, 5)
+            finally:
+                pyconject.set_hot_reload(False)
+            assert pyconject._cntx_stack.watcher is None
+
+    def test_hot_reload_inotify(self):
+        class FakeINotify:
+            def __init__(self):
+                self._fds, self.watched = os.pipe(), []
+
+            def fileno(self):
+                return self._fds[0]
+
+            def add_watch(self, directory, mask):
+                self.watched.append(directory)
+
+            def read(self, timeout=None, read_delay=None):
+                # blocks like inotify does until an event or the timeout
+                select.select(
+                    [self], [], [], None if timeout is None else timeout / 1000
+                )
+                return []
+
+            def close(self):
+                for fd in self._fds:
+                    os.close(fd)
+
+        class Frame:
+            def __init__(self, path):
+                self.provider = SimpleNamespace(
+                    sources=SimpleNamespace(stamps={path: None})
+                )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with (
+                patch.object(reload, "INotify", FakeINotify, create=True),
+                patch.object(reload, "inotify_flags", MagicMock(), create=True),
+            ):
+                watcher = reload.ConfigWatcher(None, interval=3600).start()
+                inotify = watcher._inotify
+                frame = Frame(os.path.join(tmp_dir, "configs.yml"))
+                watcher.track(frame)
+
+                # tracked frames are watched without waiting for the interval
+                deadline = time.monotonic() + 5
+                while tmp_dir not in inotify.watched and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                assert inotify.watched == [tmp_dir]
+
+                # stopping wakes the thread up
+                start = time.monotonic()
+                watcher.stop()
+                assert time.monotonic() - start < 5
+                assert watcher._thread is None and watcher._wake_fds is None
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = Path(tmp_dir) / "configs.yml"
+            config_path.write_text("snap_p:\n  snap_func:\n    a: 1\n")
+            snapshot_dir = Path(tmp_dir) / "snapshots"
+            pyconject.set_snapshot_dir(snapshot_dir)
+            try:
+                with pyconject.cntx(config_path=config_path) as cntx:
+                    configs = cntx.cntx_stack.get_configs()
+                snapshots = pyconject._cntx_stack.snapshots
+                assert snapshots._get_path(snapshot_key(config_path)).exists()
+
+                with patch("pyconject.providers.load_and_merge_configs") as load:
+                    with pyconject.cntx(config_path=config_path) as cntx:
+                        assert cntx.cntx_stack.get_configs() == configs
+                    load.assert_not_called()
+
+                config_path.write_text("snap_p:\n  snap_func:\n    a: 22\n")
+                with pyconject.cntx(config_path=config_path) as cntx:
+                    snap_configs = cntx.cntx_stack.get_configs()["snap_p"]
+                    assert snap_configs == {"snap_func": {"a": 22}}
+            finally:
+                pyconject.set_snapshot_dir(None)
+
+    def test_environment_provider(self):
+        environ = {
+            "PYCONJECT__p__sp__func__a": "1",
+            "PYCONJECT__p__sp__func__b": "{x: 2}",
+            "PYCONJECT__p__sp": "replaced-by-children",
+            "PYCONJECT__p____c": "malformed",
+            "PYCONJECT__p__Cls____init____a": "3",
+            "OTHER__p__a": "ignored",
+        }
+        provider = EnvironmentProvider(priority=30, environ=environ)
+        assert provider.load() == {
+            "p": {
+                "sp": {"func": {"a": "1", "b": "{x: 2}"}},
+                "Cls": {"__init__": {"a": "3"}},
+            }
+        }
+
+        provider = EnvironmentProvider(priority=30, environ=environ, parse_values=True)
+        assert provider.load() == {
+            "p": {
+                "sp": {"func": {"a": 1, "b": {"x": 2}}},
+                "Cls": {"__init__": {"a": 3}},
+            }
+        }
+
+    def test_env_overrides(self):
+        env = {
+            "PYCONJECT__test_context__env_func__a": "3",
+            "PYCONJECT__test_context__EnvClass____init____a": "5",
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_path = Path(tmp_dir) / "configs.yml"
+            config_path.write_text(
+                "test_context:\n  env_func:\n    a: 1\n    b: 2\n"
+                "  EnvClass:\n    __init__:\n      a: 1\n      b: 2\n"
+            )
+            with patch.dict(os.environ, env):
+                with pyconject.cntx(config_path=config_path):
+                    assert env_func() == ("3", 2)
+                    assert vars(EnvClass()) == {"a": "5", "b": 2}
+                    with pyconject.cntx(config_path=config_path):
+                        assert env_func() == ("3", 2)
+                        assert env_func(a=4) == (4, 2)
+
+                pyconject.set_env_overrides(parse_values=True)
+                try:
+                    with pyconject.cntx(config_path=config_path):
+                        assert env_func() == (3, 2)
+                    pyconject.set_env_overrides(prefix=None)
+                    with pyconject.cntx(config_path=config_path):
+                        assert env_func() == (1, 2)
+                finally:
+                    pyconject.set_env_overrides()
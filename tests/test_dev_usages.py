@@ -8,6 +8,8 @@ import yaml
 # import pyconject as root_pyconject
 from pyconject import pyconject
 
+from unittest_utils import save_namespace
+
 from dev_p.dev_sp.dev_m import (
     dev_func,
     dev_func_sp,
@@ -24,6 +26,10 @@ class DevUsageTest(TestCase):
             pyconject._cntx_stack.config_stack.pop()
         while len(pyconject._cntx_stack.target_stack) > 0:
             pyconject._cntx_stack.target_stack.pop()
+        self.restore_globals = save_namespace(globals())
+
+    def tearDown(self):
+        self.restore_globals()
 
     def test_vanilla(self):
         # this should not raise any exception
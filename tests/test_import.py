@@ -0,0 +1,84 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import pyconject
+
+# budget of the cumulative `from pyconject import pyconject` time reported by
+# `-X importtime`, once the standard library modules it builds on are imported
+IMPORT_BUDGET_MS = float(os.environ.get("PYCONJECT_IMPORT_BUDGET_MS", "20"))
+STDLIB_PRELUDE = "import inspect, logging, pathlib, typing\n"
+
+
+def run_python(*args, pycache_prefix=None):
+    env = dict(os.environ, PYTHONPATH=str(Path(pyconject.__file__).parents[1]))
+    if pycache_prefix is not None:
+        # compiled once, like an installed package; the tree is left untouched
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        env["PYTHONPYCACHEPREFIX"] = pycache_prefix
+    # without `site`, nothing but the code under test imports modules
+    result = subprocess.run(
+        [sys.executable, "-S", *args], env=env, capture_output=True, text=True
+    )
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def import_times(code, pycache_prefix=None):
+    """Returns the cumulative import time (in ms) of every module imported."""
+    times = {}
+    result = run_python("-X", "importtime", "-c", code, pycache_prefix=pycache_prefix)
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e3
+    return times
+
+
+class ImportTest(TestCase):
+
+    def test_import_budget(self):
+        code = STDLIB_PRELUDE + "from pyconject import pyconject\n"
+        elapsed = []
+        with tempfile.TemporaryDirectory() as pycache_prefix:
+            run_python("-c", code, pycache_prefix=pycache_prefix)
+            for _ in range(3):
+                times = import_times(code, pycache_prefix)
+                elapsed.append(times["pyconject"] + times["pyconject.pyconject"])
+        assert (
+            min(elapsed) < IMPORT_BUDGET_MS
+        ), f"from pyconject import pyconject took {min(elapsed):.1f} ms"
+
+    def test_deferred_imports(self):
+        code = (
+            "import sys\n"
+            "from pyconject import pyconject\n"
+            "print(' '.join(sorted(sys.modules)))\n"
+        )
+        modules = set(run_python("-c", code).stdout.split())
+        for name in [
+            "yaml",
+            "json",
+            "tomllib",
+            "pickle",
+            "concurrent.futures",
+            "pyconject.providers",
+            "pyconject.snapshot",
+            "pyconject.manifest",
+        ]:
+            assert name not in modules, f"{name} imported by pyconject"
+        assert "pyconject.context" in modules
+
+        # the context stack is only created when it is first used
+        code = (
+            "import pyconject.pyconject\n"
+            "from pyconject import context\n"
+            "assert context._cntx_stack_instance is None\n"
+            "assert pyconject.ClientYamlProvider is not None\n"
+            "assert pyconject.pyconject._cntx_stack is context.get_cntx_stack()\n"
+        )
+        run_python("-c", code)
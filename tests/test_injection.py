@@ -0,0 +1,265 @@
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import sys
+import threading
+import tempfile
+import types
+import yaml
+
+from pyconject import pyconject
+
+
+def kw_func(a, b=2, *, c, d="d"):
+    return a, b, c, d
+
+
+def var_args_func(*args, c="c"):
+    return args, c
+
+
+class KwClass:
+    def __init__(self, a, b="b"):
+        self.a, self.b = a, b
+
+    def method(self, c, d="d"):
+        return self.a, self.b, c, d
+
+    @staticmethod
+    def static_method(c):
+        return c
+
+    @classmethod
+    def class_method(cls, c):
+        return cls.__name__, c
+
+
+def with_db(f):
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        return f("db", *args, **kwargs)
+
+    return wrapper
+
+
+@with_db
+def query(db, sql="select 1"):
+    return db, sql
+
+
+def deferred_func(a, b=2):
+    return a, b
+
+
+class DeferredClass:
+    def __init__(self, a):
+        self.a = a
+
+
+class InjectionPlanTest(TestCase):
+
+    def setUp(self):
+        while len(pyconject._cntx_stack.config_stack) > 0:
+            pyconject._cntx_stack.config_stack.pop()
+        while len(pyconject._cntx_stack.target_stack) > 0:
+            pyconject._cntx_stack.target_stack.pop()
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp_dir.name) / "configs.yml"
+        with open(self.config_path, "wt") as f:
+            yaml.safe_dump(
+                {
+                    "test_injection": {
+                        "kw_func": {"a": "cfg-a", "b": "cfg-b", "c": "cfg-c"},
+                        "var_args_func": {"c": "cfg-c"},
+                        "deferred_func": {"a": "cfg-a"},
+                        "DeferredClass": {"__init__": {"a": "cfg-a"}},
+                        "KwClass": {
+                            "__init__": {"a": "cfg-a"},
+                            "method": {"c": "cfg-c"},
+                            "static_method": {"c": "cfg-static-c"},
+                            "class_method": {"c": "cfg-class-c"},
+                        },
+                    }
+                },
+                f,
+            )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_plan_built_once(self):
+        wrapped = pyconject.wrap(kw_func)
+        plan = wrapped.__pyconject_plan__
+        assert plan.prefix == "test_injection.kw_func"
+        assert plan.injectable == ((0, "a"), (1, "b"), (None, "c"), (None, "d"))
+
+        with pyconject.cntx(config_path=self.config_path):
+            with patch("inspect.signature") as signature:
+                assert wrapped() == ("cfg-a", "cfg-b", "cfg-c", "d")
+                signature.assert_not_called()
+
+    def test_given_arguments_are_kept(self):
+        wrapped = pyconject.wrap(kw_func)
+        with pyconject.cntx(config_path=self.config_path):
+            assert wrapped(1) == (1, "cfg-b", "cfg-c", "d")
+            assert wrapped(1, 2, c=3) == (1, 2, 3, "d")
+            assert wrapped(b=2) == ("cfg-a", 2, "cfg-c", "d")
+
+    def test_index_generation(self):
+        cntx_stack = pyconject._cntx_stack
+        with pyconject.cntx(config_path=self.config_path):
+            index = cntx_stack.get_index()
+            assert index.get("test_injection.kw_func") == {
+                "a": "cfg-a",
+                "b": "cfg-b",
+                "c": "cfg-c",
+            }
+            with pyconject.cntx(config_path=self.config_path):
+                assert cntx_stack.get_index().generation > index.generation
+            assert cntx_stack.get_index() is index
+
+    def test_index_registered_after_push(self):
+        def late_func(a):
+            return a
+
+        with pyconject.cntx(config_path=self.config_path):
+            index = pyconject._cntx_stack.get_index()
+            pyconject.wrap(late_func)
+            assert f"test_injection.{late_func.__qualname__}" in index.kw_args
+
+    def test_class_methods_wrapped_once(self):
+        WrappedClass = pyconject.wrap(KwClass)
+        assert getattr(WrappedClass.method, "__pyconject_wrapped__", False) is True
+
+        with pyconject.cntx(config_path=self.config_path):
+            obj = WrappedClass()
+            assert vars(obj) == {"a": "cfg-a", "b": "b"}
+            assert obj.method() == ("cfg-a", "b", "cfg-c", "d")
+            assert obj.method("c") == ("cfg-a", "b", "c", "d")
+            assert obj.static_method() == "cfg-static-c"
+            assert WrappedClass.class_method() == ("KwClass", "cfg-class-c")
+
+    def test_generated_wrapper(self):
+        wrapped = pyconject.wrap(kw_func)
+        assert wrapped.__code__.co_filename.startswith("<pyconject wrapper")
+
+        with pyconject.cntx():
+            with self.assertRaises(TypeError):
+                wrapped(1)
+            assert wrapped(1, c=3) == (1, 2, 3, "d")
+
+    def test_generated_wrapper_fallback(self):
+        wrapped = pyconject.wrap(var_args_func)
+        assert not wrapped.__code__.co_filename.startswith("<pyconject wrapper")
+
+        with pyconject.cntx(config_path=self.config_path):
+            assert wrapped(1, 2) == ((1, 2), "cfg-c")
+
+    def test_decorated_func_fallback(self):
+        # the decorator supplies `db`; the reported signature is that of `query`
+        wrapped = pyconject.wrap(query)
+        assert not wrapped.__code__.co_filename.startswith("<pyconject wrapper")
+
+        with pyconject.cntx():
+            assert wrapped(sql="x") == ("db", "x")
+            assert wrapped() == ("db", "select 1")
+
+    def test_deferred_registration(self):
+        registry = pyconject._cntx_stack.registry
+        pyconject.set_deferred_registration()
+        try:
+            with patch("pyconject.registry._create_reg_item") as create_reg_item:
+                wrapped = pyconject.func(deferred_func)
+                WrappedClass = pyconject.clss(DeferredClass)
+                create_reg_item.assert_not_called()
+            assert registry._pending[-2:] == [(wrapped, True), (WrappedClass, True)]
+
+            # the dev configs include the deferred items
+            registry.load_dev_configs()
+            assert not registry._pending
+            assert "test_injection.deferred_func" in registry._registry
+
+            with pyconject.cntx(config_path=self.config_path):
+                assert not registry._pending
+                reg_item = registry._registry["test_injection.deferred_func"]
+                assert reg_item.item is wrapped
+                assert wrapped() == ("cfg-a", 2)
+                assert vars(WrappedClass()) == {"a": "cfg-a"}
+        finally:
+            pyconject.set_deferred_registration(False)
+
+    def test_lazy_module_wrapping(self):
+        module = types.ModuleType("lazy_m")
+        module.__file__ = str(Path(self.tmp_dir.name) / "lazy_m.py")
+        exec(
+            "def used(a):\n    return a\n\ndef unused(a):\n    return a\n", vars(module)
+        )
+        with open(self.config_path, "wt") as f:
+            yaml.safe_dump({"lazy_m": {"used": {"a": 1}}}, f)
+
+        sys.modules["lazy_m"] = module
+        try:
+            pyconject.wrap(module, lazy=True)
+            assert not getattr(vars(module)["used"], "__pyconject_wrapped__", False)
+            with pyconject.cntx(config_path=self.config_path):
+                assert module.used() == 1
+            assert getattr(vars(module)["used"], "__pyconject_wrapped__", False)
+            assert not getattr(vars(module)["unused"], "__pyconject_wrapped__", False)
+
+            # only the pending functions are looked up through descriptors
+            assert "used" not in vars(type(module))
+            assert "unused" in vars(type(module))
+
+            # concurrent first accesses all get the same wrapped function
+            barrier = threading.Barrier(4)
+
+            def access(_):
+                barrier.wait()
+                return module.unused
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                funcs = list(executor.map(access, range(4)))
+            assert all(f is vars(module)["unused"] for f in funcs)
+            assert getattr(funcs[0], "__pyconject_wrapped__", False)
+            assert type(module) is types.ModuleType
+        finally:
+            del sys.modules["lazy_m"]
+
+    def test_wrap_package(self):
+        root = Path(self.tmp_dir.name) / "bulk_p"
+        for name, source in {
+            "__init__.py": "def top(a):\n    return a\n",
+            "io/__init__.py": "",
+            "io/read.py": "def read(a, b=0):\n    return a, b\n",
+            "io/broken.py": "raise ImportError('optional dependency')\n",
+            "tests/__init__.py": "raise AssertionError('must not be imported')\n",
+            "tests/test_read.py": "",
+        }.items():
+            (root / name).parent.mkdir(parents=True, exist_ok=True)
+            (root / name).write_text(source)
+        with open(self.config_path, "wt") as f:
+            yaml.safe_dump({"bulk_p": {"io": {"read": {"read": {"b": 2}}}}}, f)
+
+        sys.path.insert(0, self.tmp_dir.name)
+        try:
+            report = pyconject.wrap_package(
+                "bulk_p", include=["bulk_p.io.*"], exclude=["bulk_p.tests"]
+            )
+            assert (report.modules, report.items) == (1, 1)
+            assert report.failed == ("bulk_p.io.broken",)
+            assert report.elapsed > 0
+            assert "bulk_p.tests" not in sys.modules
+
+            import bulk_p
+            from bulk_p.io import read
+
+            assert not getattr(bulk_p.top, "__pyconject_wrapped__", False)
+            with pyconject.cntx(config_path=self.config_path):
+                assert read.read(1) == (1, 2)
+        finally:
+            sys.path.remove(self.tmp_dir.name)
+            for name in [m for m in sys.modules if m.startswith("bulk_p")]:
+                del sys.modules[name]
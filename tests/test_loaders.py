@@ -0,0 +1,104 @@
+from pathlib import Path
+from unittest import TestCase, skipUnless
+import importlib.util
+import tempfile
+import yaml
+
+from pyconject import loaders, pyconject
+from pyconject.cache import SourceFiles
+from pyconject.utils import load_configs
+
+
+class YamlLoaderTest(TestCase):
+
+    def tearDown(self):
+        loaders.set_yaml_loader()
+
+    def test_auto_prefers_libyaml(self):
+        loaders.set_yaml_loader("auto")
+        expected = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        assert loaders.get_yaml_loader() is expected
+
+    def test_explicit_loader(self):
+        loaders.set_yaml_loader("python")
+        assert loaders.get_yaml_loader() is yaml.SafeLoader
+        assert loaders.parse_yaml("a: {b: [1, 2]}") == {"a": {"b": [1, 2]}}
+
+        loaders.set_yaml_loader(yaml.SafeLoader)
+        assert loaders.get_yaml_loader() is yaml.SafeLoader
+
+        pyconject.set_yaml_loader()
+        expected = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        assert loaders.get_yaml_loader() is expected
+
+    def test_unknown_loader(self):
+        with self.assertRaises(ValueError):
+            loaders.set_yaml_loader("fast")
+
+    def test_filtered_parse(self):
+        data = (
+            "base: &base {x: 1}\n"
+            "p:\n"
+            "  m:\n"
+            "    func: {a: 1, b: [1, 2]}\n"
+            "    other: {a: 2}\n"
+            "  anchored: *base\n"
+            "  merged: {<<: *base, y: 2}\n"
+            "q: {func: {a: 3}}\n"
+        )
+        key_paths = frozenset([("p", "m", "func"), ("p", "anchored"), ("p", "merged")])
+        for name in ["python", "c"]:
+            if loaders.YAML_LOADERS[name] is None:
+                continue
+            loaders.set_yaml_loader(name)
+            assert loaders.parse_yaml_filtered(data, key_paths) == {
+                "p": {
+                    "m": {"func": {"a": 1, "b": [1, 2]}},
+                    "anchored": {"x": 1},
+                    "merged": {"x": 1, "y": 2},
+                }
+            }
+            assert loaders.get_parser("c.yml", key_paths=frozenset([("q",)]))(data) == {
+                "q": {"func": {"a": 3}}
+            }
+        parse = loaders.get_parser("c.json", key_paths=frozenset([("p", "m")]))
+        assert parse('{"p": {"m": 1, "n": 2}, "q": 3}') == {"p": {"m": 1}}
+
+
+HAS_TOML = any(importlib.util.find_spec(name) for name in ["tomllib", "tomli"])
+
+
+@skipUnless(HAS_TOML, "parsing TOML requires Python 3.11+ or tomli")
+class ConfigFormatTest(TestCase):
+
+    def test_parser_by_extension(self):
+        assert loaders.get_parser("configs.json") is loaders.parse_json
+        assert loaders.get_parser(Path("a/pyconject.toml")) is loaders.parse_toml
+        assert loaders.get_parser("configs.yml") is loaders.parse_yaml
+        assert loaders.get_parser("configs.yaml") is loaders.parse_yaml
+
+        assert loaders.parse_json(b'{"a": {"b": 1}}') == {"a": {"b": 1}}
+        assert loaders.parse_toml(b"[a]\nb = 1\n") == {"a": {"b": 1}}
+
+    def test_load_json_and_toml(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+            (tmp_dir / "values.toml").write_text('[func]\nb = "two"\n')
+            (tmp_dir / "configs.json").write_text(
+                '{"func": {"a": 1, "b": "@values.toml:func.b"}}'
+            )
+
+            # a missing `.yml` file falls back to its `.json` sibling
+            sources = SourceFiles()
+            cfgs, stamp = load_configs(tmp_dir / "configs.yml", sources)
+            assert cfgs == {"func": {"a": 1, "b": "two"}}
+            assert stamp is not None
+            assert str(tmp_dir / "configs.json") in sources.stamps
+            assert str(tmp_dir / "values.toml") in sources.stamps
+            assert sources.is_fresh()
+
+            # creating the `.yml` file takes precedence again
+            (tmp_dir / "configs.yml").write_text("func:\n  a: 3\n")
+            assert not sources.is_fresh()
+            cfgs, _ = load_configs(tmp_dir / "configs.yml")
+            assert cfgs == {"func": {"a": 3}}
@@ -0,0 +1,120 @@
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+import io
+import os
+import tempfile
+
+from pyconject import pyconject
+from pyconject.__main__ import main
+from pyconject.manifest import build_manifest
+from dev_p.dev_sp.dev_m import dev_func  # noqa: F401 registers dev_p
+
+_CONFIG_PATH = object()  # the test's config file
+
+
+class ManifestTest(TestCase):
+
+    def setUp(self):
+        while len(pyconject._cntx_stack.config_stack) > 0:
+            pyconject._cntx_stack.config_stack.pop()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.config_path = Path(self.tmp_dir.name) / "configs.yml"
+        self.config_path.write_text("dev_p:\n  dev_sp:\n    dev_m:\n      a: 1\n")
+        self.manifest_dir = Path(self.tmp_dir.name) / "manifests"
+
+    def tearDown(self):
+        pyconject.set_manifest_dir(None)
+        self.tmp_dir.cleanup()
+
+    def get_configs(self, target="dev", config_path=_CONFIG_PATH):
+        if config_path is _CONFIG_PATH:
+            config_path = self.config_path
+        with patch.dict(os.environ, {}, clear=True):
+            with pyconject.cntx(config_path=config_path, target=target) as cntx:
+                return cntx.cntx_stack.get_configs()
+
+    def test_compile_and_load(self):
+        expected = self.get_configs()
+        with redirect_stdout(io.StringIO()) as out:
+            main(
+                [
+                    "compile",
+                    "--package",
+                    "dev_p",
+                    "--target",
+                    "dev",
+                    "--config-path",
+                    str(self.config_path),
+                    "--output",
+                    str(self.manifest_dir),
+                ]
+            )
+        assert "compiled 2 manifest(s)" in out.getvalue()
+        assert (self.manifest_dir / "pyconject.manifest").exists()
+        assert (self.manifest_dir / "pyconject-dev.manifest").exists()
+
+        pyconject.set_manifest_dir(self.manifest_dir)
+        registry = pyconject._cntx_stack.registry
+        with patch.object(registry, "_get_dev_config_files") as discover:
+            with patch("pyconject.providers.load_and_merge_configs") as load:
+                assert self.get_configs() == expected
+                discover.assert_not_called()
+                load.assert_not_called()
+
+        # items registered after compiling make the manifest out of date
+        def late_func(a):
+            return a
+
+        pyconject.wrap(late_func)
+        with patch("pyconject.providers.load_and_merge_configs") as load:
+            self.get_configs()
+            load.assert_called()
+
+    def test_changed_files(self):
+        main(
+            ["compile", "-p", "dev_p", "-c", str(self.config_path)]
+            + ["-t", "dev", "-o", str(self.manifest_dir)]
+        )
+        pyconject.set_manifest_dir(self.manifest_dir)
+        self.config_path.write_text("dev_p:\n  dev_sp:\n    dev_m:\n      a: 22\n")
+        assert self.get_configs()["dev_p"]["dev_sp"]["dev_m"]["a"] == 22
+
+        # targets without a manifest are loaded from the files
+        with patch("pyconject.providers.load_and_merge_configs") as load:
+            self.get_configs(target="stg")
+            load.assert_called()
+
+    def test_new_client_config(self):
+        # the default `./configs.yml` is relative to the working directory
+        self.config_path.unlink()
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp_dir.name)
+        manifest = build_manifest(pyconject._cntx_stack.registry, target="dev")
+        assert all(os.path.isabs(d) for d in manifest["directories"])
+        assert os.getcwd() in manifest["directories"]
+
+        main(["compile", "-p", "dev_p", "-t", "dev", "-o", str(self.manifest_dir)])
+        pyconject.set_manifest_dir(self.manifest_dir)
+        with patch("pyconject.providers.load_and_merge_configs") as load:
+            assert "a" not in self.get_configs(config_path=None)["dev_p"]["dev_sp"]
+            load.assert_not_called()
+
+        Path("configs.yml").write_text("dev_p:\n  dev_sp:\n    a: 3\n")
+        assert self.get_configs(config_path=None)["dev_p"]["dev_sp"]["a"] == 3
+
+    def test_other_working_directory(self):
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp_dir.name)
+        main(["compile", "-p", "dev_p", "-t", "dev", "-o", str(self.manifest_dir)])
+        pyconject.set_manifest_dir(self.manifest_dir)
+
+        # the default `./configs.yml` of another directory is not the compiled one
+        other_dir = Path(self.tmp_dir.name) / "other"
+        other_dir.mkdir()
+        (other_dir / "configs.yml").write_text("dev_p:\n  dev_sp:\n    a: 4\n")
+        os.chdir(other_dir)
+        with self.assertLogs("pyconject.manifest", level="DEBUG") as logs:
+            assert self.get_configs(config_path=None)["dev_p"]["dev_sp"]["a"] == 4
+        assert "was compiled for" in logs.output[0]
@@ -0,0 +1,67 @@
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+import tempfile
+
+from pyconject.cache import SourceFiles, parsed_file_cache
+from pyconject.references import ReferenceResolver
+from pyconject.utils import load_configs
+
+
+class ReferenceResolverTest(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, name, text):
+        path = self.directory / name
+        path.write_text(text)
+        return path
+
+    def test_chained_references(self):
+        self.write("values.yml", "a: '@more/values.yml:b'\nd: '@@literal'\n")
+        (self.directory / "more").mkdir()
+        self.write("more/values.yml", "b: {c: 1, e: '@../values.yml:d'}\n")
+        path = self.write("configs.yml", "func:\n  a: '@values.yml:a'\n")
+
+        sources = SourceFiles()
+        cfgs, _ = load_configs(path, sources)
+        assert cfgs == {"func": {"a": {"c": 1, "e": "@literal"}}}
+        assert str(self.directory / "more" / "values.yml") in sources.stamps
+
+    def test_referenced_file_parsed_once(self):
+        self.write("values.yml", "".join(f"v{i}: {i}\n" for i in range(100)))
+        data = {f"f{i}": {"a": f"@values.yml:v{i}"} for i in range(100)}
+
+        resolver = ReferenceResolver()
+        with patch.object(
+            parsed_file_cache, "load", wraps=parsed_file_cache.load
+        ) as load:
+            resolved = resolver.resolve(data, self.directory / "configs.yml")
+            load.assert_called_once()
+        assert resolved == {f"f{i}": {"a": i} for i in range(100)}
+        assert resolver.unresolved == []
+
+    def test_unresolved_references(self):
+        self.write("values.yml", "a: '@values.yml:b'\nb: '@values.yml:a'\nc: 1\n")
+        data = {
+            "cycle": "@values.yml:a",
+            "missing_key": "@values.yml:c.d",
+            "missing_file": "@missing.yml:a",
+            "not_a_reference": "@no-colon",
+        }
+
+        resolver = ReferenceResolver()
+        with self.assertLogs("pyconject.references", level="WARNING") as logs:
+            resolved = resolver.resolve(data, self.directory / "configs.yml")
+            resolver.report()
+        assert resolved == data
+        reasons = {u.reference: u.reason for u in resolver.unresolved}
+        assert reasons["@values.yml:a"] == "circular reference"
+        assert "'d' not found" in reasons["@values.yml:c.d"]
+        assert "@missing.yml:a" in reasons
+        assert len(logs.output) == 1
@@ -0,0 +1,116 @@
+from unittest import TestCase
+from unittest.mock import patch
+import gc
+import threading
+
+from pyconject import pyconject
+from pyconject.context import ConfigIndex
+from pyconject.registry import PrefixTrie, Registry, _get_reg_item, _reg_items
+
+
+class PrefixTrieTest(TestCase):
+
+    def setUp(self):
+        self.trie = PrefixTrie()
+        for prefix in [
+            "p.sp.m.func",
+            ".p",
+            "p.sp.m",
+            "p.sp.m.Cls",
+            "q.m.func",
+            "p.sp",
+        ]:
+            self.trie.add(prefix)
+
+    def test_ancestors_first(self):
+        prefixes = list(self.trie)
+        for prefix in prefixes:
+            for ancestor in self.trie.get_ancestors(prefix):
+                assert prefixes.index(ancestor) <= prefixes.index(prefix)
+        assert sorted(prefixes) == sorted(set(prefixes))
+        assert len(prefixes) == 6
+
+    def test_get_ancestors(self):
+        assert self.trie.get_ancestors("p.sp.m.func") == [
+            ".p",
+            "p.sp",
+            "p.sp.m",
+            "p.sp.m.func",
+        ]
+        assert self.trie.get_ancestors("p.other.func") == [".p"]
+        assert self.trie.get_ancestors("r.func") == []
+
+    def test_find(self):
+        assert list(self.trie.find("p.sp.m")) == [
+            "p.sp.m",
+            "p.sp.m.func",
+            "p.sp.m.Cls",
+        ]
+        assert self.trie.find("p.missing") is None
+
+    def test_index_matches_lookups(self):
+        configs = {
+            "p": {"sp": {"m": {"func": {"a": 1}, "Cls": 3}}},
+            "q": {"m": {"func": {"b": 2}}},
+        }
+        index = ConfigIndex(configs, 0)
+        index.add_trie(self.trie)
+        expected = ConfigIndex(configs, 0, prefixes=list(self.trie))
+        assert index.kw_args == expected.kw_args
+
+
+class RegistryTest(TestCase):
+
+    def test_prefixes_under_package(self):
+        from dev_p.dev_sp.dev_m import dev_func  # noqa: F401 registers dev_p
+
+        registry = pyconject._cntx_stack.registry
+        prefixes = registry.get_prefixes_under("dev_p.dev_sp")
+        assert prefixes[0] == "dev_p.dev_sp"
+        assert "dev_p.dev_sp.dev_m.dev_func" in prefixes
+        assert ".dev_p" not in prefixes
+        assert registry.get_prefixes_under("missing_p") == []
+
+    def test_flush_releases_lock(self):
+        def func(a):
+            return a
+
+        def other(a):
+            return a
+
+        registry = Registry(pyconject._cntx_stack)
+        registered, blocked = [], []
+
+        def register(item, dev_override):
+            registered.append(item)
+            if item is func:
+                # e.g. another thread importing a module that defers an item
+                thread = threading.Thread(target=registry._defer, args=(other, True))
+                thread.start()
+                thread.join(timeout=5)
+                blocked.append(thread.is_alive())
+
+        registry._pending = [(func, True)]
+        with patch.object(registry, "_register", side_effect=register):
+            registry.flush()
+        assert blocked == [False], "flush holds the pending lock while registering"
+        assert len(registered) == 2 and registered[0] is func
+        assert not registry._pending
+
+    def test_reg_items_memoized(self):
+        def func(a, b=1):
+            return a, b
+
+        registry = Registry(pyconject._cntx_stack)
+        wrapped = registry._register(func, dev_override=True)
+        reg_item = registry._registry[f"{__name__}.{func.__qualname__}"]
+        assert _get_reg_item(func) is reg_item
+        assert registry._register(func, dev_override=True) is wrapped
+        assert _get_reg_item("dev_p.dev_sp") is _get_reg_item("dev_p.dev_sp")
+
+        # entries go away with their object
+        key_ref = next(ref for ref in _reg_items.keyrefs() if ref() is func)
+        del func, wrapped, reg_item, registry
+        gc.collect()
+        assert key_ref() is None
+        assert key_ref not in _reg_items.data
@@ -1,5 +1,6 @@
 from pathlib import Path
-from typing import List
+from typing import Callable, List
+import inspect
 
 from unittest.mock import mock_open, Mock
 
@@ -36,3 +37,32 @@ def get_dynamic_mock_open(args_to_read_data={"": ""}) -> Mock:
         return mock_open(read_data=read_data)(*args, **kwargs)
 
     return dynamic_mock_open
+
+
+def save_namespace(namespace: dict) -> Callable[[], None]:
+    """
+    Returns a function restoring `namespace` and the modules in it as they are now.
+
+    `pyconject.init(globals())` wraps the modules found in the namespace (e.g.
+    `os` or `tempfile`) in place; restoring them keeps other tests unaffected.
+    """
+    saved = dict(namespace)
+    modules = {
+        id(value): (value, dict(vars(value)))
+        for value in saved.values()
+        if inspect.ismodule(value)
+    }
+
+    def restore():
+        for module, attrs in modules.values():
+            module_vars = vars(module)
+            for name in [name for name in module_vars if name not in attrs]:
+                del module_vars[name]
+            for name, value in attrs.items():
+                if module_vars.get(name, None) is not value:
+                    module_vars[name] = value
+        for name in [name for name in namespace if name not in saved]:
+            del namespace[name]
+        namespace.update(saved)
+
+    return restore